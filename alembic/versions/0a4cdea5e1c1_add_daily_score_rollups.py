@@ -0,0 +1,54 @@
+"""add daily score rollups
+
+Revision ID: 0a4cdea5e1c1
+Revises: 0a4eb317ca40
+Create Date: 2026-10-18 13:40:07.215934
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a4cdea5e1c1'
+down_revision: Union[str, None] = '0a4eb317ca40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('user_quiz_daily_scores',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('quiz_id', sa.Integer(), nullable=False),
+    sa.Column('company_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('correct_answers', sa.Integer(), nullable=False),
+    sa.Column('total_questions', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['quiz_id'], ['quizzes.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'quiz_id', 'day', name='uq_user_quiz_daily_scores')
+    )
+    op.create_index('ix_user_quiz_daily_scores_company_user', 'user_quiz_daily_scores', ['company_id', 'user_id', 'day'], unique=False)
+    op.create_table('company_daily_scores',
+    sa.Column('company_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('correct_answers', sa.Integer(), nullable=False),
+    sa.Column('total_questions', sa.Integer(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('company_id', 'day', name='uq_company_daily_scores')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('company_daily_scores')
+    op.drop_index('ix_user_quiz_daily_scores_company_user', table_name='user_quiz_daily_scores')
+    op.drop_table('user_quiz_daily_scores')
@@ -0,0 +1,56 @@
+"""add quiz results
+
+Revision ID: 0a4eb317ca40
+Revises: dbc300914575
+Create Date: 2026-10-18 10:12:41.508113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0a4eb317ca40'
+down_revision: Union[str, None] = 'dbc300914575'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('quiz_results',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('quiz_id', sa.Integer(), nullable=False),
+    sa.Column('company_id', sa.Integer(), nullable=False),
+    sa.Column('correct_answers', sa.Integer(), nullable=False),
+    sa.Column('total_questions', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['company_id'], ['companies.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['quiz_id'], ['quizzes.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_quiz_results_user_quiz_created', 'quiz_results', ['user_id', 'quiz_id', 'created_at'], unique=False)
+    op.create_index('ix_quiz_results_company_id', 'quiz_results', ['company_id'], unique=False)
+    op.create_table('quiz_result_answers',
+    sa.Column('result_id', sa.Integer(), nullable=False),
+    sa.Column('question_id', sa.Integer(), nullable=False),
+    sa.Column('answer_id', sa.Integer(), nullable=True),
+    sa.Column('is_correct', sa.Boolean(), nullable=False),
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['answer_id'], ['answers.id'], ondelete='SET NULL'),
+    sa.ForeignKeyConstraint(['question_id'], ['questions.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['result_id'], ['quiz_results.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_quiz_result_answers_result_id'), 'quiz_result_answers', ['result_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_quiz_result_answers_result_id'), table_name='quiz_result_answers')
+    op.drop_table('quiz_result_answers')
+    op.drop_index('ix_quiz_results_company_id', table_name='quiz_results')
+    op.drop_index('ix_quiz_results_user_quiz_created', table_name='quiz_results')
+    op.drop_table('quiz_results')
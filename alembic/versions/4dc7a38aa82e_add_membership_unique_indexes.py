@@ -0,0 +1,37 @@
+"""add membership unique indexes
+
+Revision ID: 4dc7a38aa82e
+Revises: ae0902e12135
+Create Date: 2026-10-18 17:26:44.902113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4dc7a38aa82e'
+down_revision: Union[str, None] = 'ae0902e12135'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('company_users', 'invitations', 'requests')
+
+
+def upgrade() -> None:
+    for table in TABLES:
+        # keep the oldest row of every (company_id, user_id) pair before making it unique
+        op.execute(
+            f'DELETE FROM {table} a USING {table} b '
+            f'WHERE a.company_id = b.company_id AND a.user_id = b.user_id AND a.id > b.id'
+        )
+        op.create_index(f'uq_{table}_company_user', table, ['company_id', 'user_id'], unique=True)
+        op.create_index(op.f(f'ix_{table}_user_id'), table, ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    for table in reversed(TABLES):
+        op.drop_index(op.f(f'ix_{table}_user_id'), table_name=table)
+        op.drop_index(f'uq_{table}_company_user', table_name=table)
@@ -0,0 +1,45 @@
+'''Rebuild the daily score rollups from quiz_results.
+
+Run from the project root: PYTHONPATH=app python -m commands.backfill_score_rollups [--chunk-size N]
+
+The rollups are cleared and the highest result id is read in one transaction. Results
+up to that id are then folded in id-range chunks, each chunk one INSERT ... SELECT
+committed on its own, while newer attempts keep updating the rollups themselves.
+Attempts still in flight when it starts can be counted twice, so run it when traffic is low.'''
+import asyncio
+from argparse import ArgumentParser
+from sqlalchemy import select, delete, func
+from db.database import async_session, async_engine
+from db.models import QuizResult, UserQuizDailyScore, CompanyDailyScore
+from utils.score_rollups import apply_rollups
+
+
+async def backfill(chunk_size: int):
+    async with async_session() as session:
+        await session.execute(delete(UserQuizDailyScore))
+        await session.execute(delete(CompanyDailyScore))
+        result = await session.execute(select(func.max(QuizResult.id)))
+        last_id = result.scalar() or 0
+        await session.commit()
+
+        after = 0
+        while after < last_id:
+            upto = min(after + chunk_size, last_id)
+            await apply_rollups(session, (QuizResult.id > after) & (QuizResult.id <= upto))
+            await session.commit()
+            print(f"Folded results {after + 1}..{upto} of {last_id}")
+            after = upto
+
+
+async def main():
+    parser = ArgumentParser(description="Rebuild daily score rollups from quiz results")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    args = parser.parse_args()
+    try:
+        await backfill(args.chunk_size)
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+'''Recompute the leaderboards from quiz_results.
+
+Run from the project root: PYTHONPATH=app python -m commands.rebuild_leaderboards [--batch-size N]
+
+Sums are aggregated per (company, user) in keyset-paginated batches and loaded into
+staging keys, which replace the live boards once everything is loaded. Attempts
+scored while the rebuild runs are not included, so run it when traffic is low.'''
+import asyncio
+from argparse import ArgumentParser
+from sqlalchemy import select, func, tuple_
+from db.database import async_session, async_engine
+from db.models import QuizResult
+from db.redis import get_redis, close_redis_pool
+from utils.leaderboard import leaderboards, company_board, sums_key, GLOBAL
+
+STAGING = "rebuild:"
+
+# KEYS come in (staging, live) pairs. A board whose users all have zero totals never
+# gets a staging sorted set, so a missing staging key deletes the live one instead of
+# failing the RENAME - the whole swap applies in one step either way.
+SWAP_BOARDS = """
+for i = 1, #KEYS, 2 do
+    if redis.call('EXISTS', KEYS[i]) == 1 then
+        redis.call('RENAME', KEYS[i], KEYS[i + 1])
+    else
+        redis.call('DEL', KEYS[i + 1])
+    end
+end
+return 1
+"""
+
+
+async def delete_matching(redis, pattern: str, keep=frozenset()):
+    async for key in redis.scan_iter(match=pattern):
+        if key.removesuffix(":sums") not in keep:
+            await redis.delete(key)
+
+
+async def rebuild(batch_size: int):
+    redis = get_redis()
+    await delete_matching(redis, STAGING + "leaderboard:*")
+
+    boards = {GLOBAL}
+    after = (0, 0)
+    async with async_session() as session:
+        while True:
+            statement = (
+                select(
+                    QuizResult.company_id,
+                    QuizResult.user_id,
+                    func.sum(QuizResult.correct_answers),
+                    func.sum(QuizResult.total_questions),
+                )
+                .where(tuple_(QuizResult.company_id, QuizResult.user_id) > after)
+                .group_by(QuizResult.company_id, QuizResult.user_id)
+                .order_by(QuizResult.company_id, QuizResult.user_id)
+                .limit(batch_size)
+            )
+            result = await session.execute(statement)
+            rows = result.all()
+            if not rows:
+                break
+
+            async with redis.pipeline(transaction=False) as pipe:
+                for company_id, user_id, correct_answers, total_questions in rows:
+                    board = company_board(company_id)
+                    boards.update((GLOBAL, board))
+                    staging = (STAGING + GLOBAL, STAGING + board)
+                    await leaderboards.add(pipe, staging, user_id, correct_answers, total_questions)
+                await pipe.execute()
+
+            after = tuple(rows[-1][:2])
+            print(f"Loaded {len(rows)} rows up to company {after[0]}, user {after[1]}")
+
+    keys = [
+        key
+        for board in boards
+        for live in (board, sums_key(board))
+        for key in (STAGING + live, live)
+    ]
+    await redis.register_script(SWAP_BOARDS)(keys=keys)
+
+    await delete_matching(redis, "leaderboard:company:*", keep=boards)
+    print(f"Rebuilt {len(boards)} leaderboards")
+
+
+async def main():
+    parser = ArgumentParser(description="Recompute leaderboards from quiz results")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    try:
+        await rebuild(args.batch_size)
+    finally:
+        await close_redis_pool()
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,28 @@
+'''Send due quiz retake notifications outside the API process.
+
+Run from the project root: PYTHONPATH=app python -m commands.retake_scheduler [--once]
+
+Set retake_scheduler_enabled=false for the API when this worker is used instead,
+although running both is safe since batches are claimed with SKIP LOCKED.'''
+import asyncio
+from argparse import ArgumentParser
+from db.database import async_engine
+from utils.retake_scheduler import retake_scheduler
+
+
+async def main():
+    parser = ArgumentParser(description="Send due quiz retake notifications")
+    parser.add_argument("--once", action="store_true", help="process everything due now and exit")
+    args = parser.parse_args()
+    try:
+        if args.once:
+            notified = await retake_scheduler.run_once()
+            print(f"Sent {notified} retake notifications")
+        else:
+            await retake_scheduler.run_forever()
+    finally:
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -13,8 +13,18 @@ class Settings(BaseSettings):
     db_port: int
     db_name: str
 
+    db_echo: bool = False
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800
+    db_pool_pre_ping: bool = True
+    db_statement_cache_size: int = 100
+
     redis_host: str
     redis_port: int
+    redis_max_connections: int = 50
+    redis_socket_timeout: float = 5.0
 
     PROD: str = "INFO"
 
@@ -24,6 +34,37 @@ class Settings(BaseSettings):
     AUTH0_ALGORITHMS: str
     SIGNING_KEY: str
 
+    token_cache_size: int = 10000
+    token_cache_ttl: int = 300
+
+    password_hash_workers: int = 4
+
+    page_size_default: int = 3
+    page_size_max: int = 100
+    count_cache_ttl: int = 30
+
+    user_cache_ttl: int = 300
+    user_cache_local_size: int = 10000
+    user_cache_local_ttl: int = 10
+
+    role_cache_ttl: int = 300
+    role_cache_local_size: int = 10000
+    role_cache_local_ttl: int = 5
+    permission_path_cache_size: int = 50000
+    permission_path_cache_ttl: int = 60
+    my_companies_cache_ttl: int = 30
+    answer_key_cache_ttl: int = 3600
+    answer_key_local_size: int = 1000
+    answer_key_local_ttl: int = 10
+    quiz_tree_cache_ttl: int = 3600
+
+    quiz_responses_ttl: int = 7 * 24 * 3600
+    export_batch_size: int = 500
+
+    retake_scheduler_enabled: bool = True
+    retake_batch_size: int = 1000
+    retake_interval: float = 60.0
+
     class Config:
         env_file = ".env"
 
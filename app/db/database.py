@@ -1,17 +1,107 @@
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from core.config import settings
+from utils.count_cache import count_cache
 from typing import AsyncGenerator
+from itertools import chain
+from threading import Lock
+from time import perf_counter
 
 DATABASE_URL = settings.database_url
 
-async_engine = create_async_engine(DATABASE_URL, echo=True)
 
-async_session = async_sessionmaker(async_engine, expire_on_commit=False, class_=AsyncSession)
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    '''Queue pool that records how long checkouts wait for a connection'''
+    checkouts = 0
+    wait_total = 0.0
+    wait_max = 0.0
+    _lock = Lock()
 
-async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
-    async with async_session() as session:
-        yield session
+    def _do_get(self):
+        started = perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = perf_counter() - started
+            with self._lock:
+                InstrumentedQueuePool.checkouts += 1
+                InstrumentedQueuePool.wait_total += waited
+                InstrumentedQueuePool.wait_max = max(InstrumentedQueuePool.wait_max, waited)
+
+
+async_engine = create_async_engine(
+    DATABASE_URL,
+    echo=settings.db_echo,
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_timeout=settings.db_pool_timeout,
+    pool_recycle=settings.db_pool_recycle,
+    pool_pre_ping=settings.db_pool_pre_ping,
+    connect_args={
+        "statement_cache_size": settings.db_statement_cache_size,
+        "prepared_statement_cache_size": settings.db_statement_cache_size,
+    },
+)
+
+class TrackingSession(Session):
+    '''Session that records which tables its committed transactions wrote to'''
+
+@event.listens_for(TrackingSession, "after_flush")
+def track_flushed_tables(session, flush_context):
+    tables = session.info.setdefault("pending_tables", set())
+    for obj in chain(session.new, session.dirty, session.deleted):
+        tables.add(obj.__table__.name)
 
+@event.listens_for(TrackingSession, "do_orm_execute")
+def track_statement_tables(orm_execute_state):
+    # statements writing through data-modifying CTEs declare their tables with
+    # .execution_options(writes_tables=(...))
+    written = set(orm_execute_state.execution_options.get("writes_tables", ()))
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        written.add(orm_execute_state.statement.table.name)
+    if written:
+        tables = orm_execute_state.session.info.setdefault("pending_tables", set())
+        tables.update(written)
 
+@event.listens_for(TrackingSession, "after_commit")
+def collect_written_tables(session):
+    written = session.info.setdefault("written_tables", set())
+    written.update(session.info.pop("pending_tables", ()))
 
+@event.listens_for(TrackingSession, "after_rollback")
+def discard_pending_tables(session):
+    session.info.pop("pending_tables", None)
+
+
+async_session = async_sessionmaker(
+    async_engine,
+    expire_on_commit=False,
+    class_=AsyncSession,
+    sync_session_class=TrackingSession,
+)
+
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    async with async_session() as session:
+        try:
+            yield session
+        finally:
+            written_tables = session.info.pop("written_tables", None)
+            if written_tables:
+                await count_cache.invalidate(written_tables)
 
+def pool_stats() -> dict:
+    pool = async_engine.pool
+    checkouts = InstrumentedQueuePool.checkouts
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": settings.db_max_overflow,
+        "checkouts": checkouts,
+        "wait_avg_ms": round(InstrumentedQueuePool.wait_total / checkouts * 1000, 3) if checkouts else 0.0,
+        "wait_max_ms": round(InstrumentedQueuePool.wait_max * 1000, 3),
+    }
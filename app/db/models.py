@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Date, Index, UniqueConstraint, func, false
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.ext.declarative import declarative_base
@@ -44,31 +44,43 @@ class Invitation(Base):
     __tablename__ = "invitations"
 
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
 
     company = relationship("Company", backref="invitations")
     user = relationship("User", foreign_keys=[user_id], backref="invitations")
 
+    __table_args__ = (
+        Index("uq_invitations_company_user", "company_id", "user_id", unique=True),
+    )
+
 class Request(Base):
     __tablename__ = "requests"
 
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
 
     company = relationship("Company", backref="requests")
     user = relationship("User", foreign_keys=[user_id], backref="requests")
 
+    __table_args__ = (
+        Index("uq_requests_company_user", "company_id", "user_id", unique=True),
+    )
+
 
 class CompanyUser(Base):
     __tablename__ = "company_users"
 
     company_id = Column(Integer, ForeignKey("companies.id"), nullable=False)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     is_administrator = Column(Boolean, default=False)
 
     company = relationship("Company", back_populates="company_users")
     user = relationship("User", back_populates="company_users")
 
+    __table_args__ = (
+        Index("uq_company_users_company_user", "company_id", "user_id", unique=True),
+    )
+
 # quizzes
 class Quiz(Base):
     __tablename__ = "quizzes"
@@ -101,3 +113,91 @@ class Answer(Base):
 
     question = relationship("Question", back_populates="options")
 
+
+# quiz attempts
+class QuizResult(Base):
+    __tablename__ = "quiz_results"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    quiz_id = Column(Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), nullable=False)
+    company_id = Column(Integer, ForeignKey("companies.id", ondelete="CASCADE"), nullable=False)
+    correct_answers = Column(Integer, nullable=False)
+    total_questions = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    answers = relationship("QuizResultAnswer", back_populates="result")
+
+    __table_args__ = (
+        Index("ix_quiz_results_user_quiz_created", "user_id", "quiz_id", "created_at"),
+        Index("ix_quiz_results_company_id", "company_id"),
+    )
+
+
+class QuizResultAnswer(Base):
+    __tablename__ = "quiz_result_answers"
+
+    result_id = Column(Integer, ForeignKey("quiz_results.id", ondelete="CASCADE"), nullable=False, index=True)
+    question_id = Column(Integer, ForeignKey("questions.id", ondelete="CASCADE"), nullable=False)
+    answer_id = Column(Integer, ForeignKey("answers.id", ondelete="SET NULL"))
+    is_correct = Column(Boolean, nullable=False)
+
+    result = relationship("QuizResult", back_populates="answers")
+
+
+class UserQuizDailyScore(Base):
+    '''quiz_results summed per user, quiz and day, updated with every attempt'''
+    __tablename__ = "user_quiz_daily_scores"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    quiz_id = Column(Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), nullable=False)
+    company_id = Column(Integer, ForeignKey("companies.id", ondelete="CASCADE"), nullable=False)
+    day = Column(Date, nullable=False)
+    attempts = Column(Integer, nullable=False)
+    correct_answers = Column(Integer, nullable=False)
+    total_questions = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "quiz_id", "day", name="uq_user_quiz_daily_scores"),
+        Index("ix_user_quiz_daily_scores_company_user", "company_id", "user_id", "day"),
+    )
+
+
+class CompanyDailyScore(Base):
+    '''quiz_results summed per company and day, updated with every attempt'''
+    __tablename__ = "company_daily_scores"
+
+    company_id = Column(Integer, ForeignKey("companies.id", ondelete="CASCADE"), nullable=False)
+    day = Column(Date, nullable=False)
+    attempts = Column(Integer, nullable=False)
+    correct_answers = Column(Integer, nullable=False)
+    total_questions = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        UniqueConstraint("company_id", "day", name="uq_company_daily_scores"),
+    )
+
+
+# retakes
+class QuizRetake(Base):
+    '''When a user is next due to retake a quiz, set from frequency_days on every attempt'''
+    __tablename__ = "quiz_retakes"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    quiz_id = Column(Integer, ForeignKey("quizzes.id", ondelete="CASCADE"), nullable=False)
+    company_id = Column(Integer, ForeignKey("companies.id", ondelete="CASCADE"), nullable=False)
+    next_due_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "quiz_id", name="uq_quiz_retakes_user_quiz"),
+    )
+
+
+class Notification(Base):
+    __tablename__ = "notifications"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    company_id = Column(Integer, ForeignKey("companies.id", ondelete="CASCADE"))
+    quiz_id = Column(Integer, ForeignKey("quizzes.id", ondelete="CASCADE"))
+    message = Column(String, nullable=False)
+    is_read = Column(Boolean, nullable=False, server_default=false())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -1,10 +1,42 @@
-from aioredis import Redis
+from typing import Optional
+from aioredis import Redis, ConnectionPool
 from core.config import settings
 
 REDIS_URL = settings.redis_url
 
+redis_pool: Optional[ConnectionPool] = None
+
+def get_redis_pool() -> ConnectionPool:
+    '''Application-wide pool, created on startup (or first use) and closed on shutdown'''
+    global redis_pool
+    if redis_pool is None:
+        redis_pool = ConnectionPool.from_url(
+            REDIS_URL,
+            max_connections=settings.redis_max_connections,
+            socket_timeout=settings.redis_socket_timeout,
+            decode_responses=True,
+        )
+    return redis_pool
+
+def get_redis() -> Redis:
+    return Redis(connection_pool=get_redis_pool())
+
 async def get_redis_client() -> Redis:
-    redis = Redis.from_url(
-        REDIS_URL, max_connections=10, decode_responses=True
-    )
-    return redis
\ No newline at end of file
+    return get_redis()
+
+async def close_redis_pool():
+    global redis_pool
+    if redis_pool is not None:
+        await redis_pool.disconnect()
+        redis_pool = None
+
+def redis_pool_stats() -> dict:
+    if redis_pool is None:
+        return {"initialized": False}
+    return {
+        "initialized": True,
+        "max_connections": redis_pool.max_connections,
+        "created": redis_pool._created_connections,
+        "in_use": len(redis_pool._in_use_connections),
+        "available": len(redis_pool._available_connections),
+    }
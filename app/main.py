@@ -8,10 +8,21 @@ from routers.auth_route import router_auth
 from routers.company_route import router_company
 from routers.company_action import router_company_action
 from routers.quiz_route import router_quiz
+from routers.diagnostics import router_diagnostics
+from routers.leaderboard_route import router_leaderboard
+from routers.analytics_route import router_analytics
+from routers.export_route import router_export
 
 
 from core.config import settings
 from starlette.middleware.sessions import SessionMiddleware
+from contextlib import asynccontextmanager, suppress
+import asyncio
+
+from db.database import async_engine
+from db.redis import get_redis_pool, close_redis_pool
+from utils.retake_scheduler import retake_scheduler
+from utils.utils import password_pool
 
 
 
@@ -23,7 +34,20 @@ logger = getLogger(__name__)
 def get_project_root():
     return Path(__file__).parent
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    get_redis_pool()
+    scheduler = asyncio.create_task(retake_scheduler.run_forever()) if settings.retake_scheduler_enabled else None
+    yield
+    if scheduler is not None:
+        scheduler.cancel()
+        with suppress(asyncio.CancelledError):
+            await scheduler
+    await close_redis_pool()
+    await async_engine.dispose()
+    password_pool.shutdown()
+
+app = FastAPI(lifespan=lifespan)
 
 origins = [
     "http://127.0.0.1:8000",
@@ -35,6 +59,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Total-Count"],
 )
 app.add_middleware(SessionMiddleware, secret_key="add any string...")
 
@@ -47,6 +72,10 @@ app.include_router(router_auth)
 #app.include_router(router_company_action)
 #app.include_router(router_company)
 app.include_router(router_quiz)
+app.include_router(router_leaderboard)
+app.include_router(router_analytics)
+app.include_router(router_export)
+app.include_router(router_diagnostics)
 
 
 def run():
@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from db.database import get_async_session
+from utils.auth import get_current_user
+from sqlalchemy.ext.asyncio import AsyncSession
+from schemas.user_schema import UserId
+from schemas.analytics_schema import ScoreSummary
+from services.analytics_service import AnalyticsService
+from utils.exceptions import NotPermission, CompanyNotFoundException
+from datetime import date
+from typing import Optional
+
+
+router_analytics = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+
+
+# USER
+@router_analytics.get('/me', summary="My average score by day", response_model=ScoreSummary)
+async def my_scores(
+    since: Optional[date] = Query(None),
+    session: AsyncSession = Depends(get_async_session),
+    user: UserId = Depends(get_current_user)
+):
+    analytics_service = AnalyticsService(session, user)
+    return await analytics_service.my_scores(since)
+
+@router_analytics.get('/me/quiz/{quiz_id}', summary="My score history for quiz", response_model=ScoreSummary)
+async def my_quiz_scores(
+    quiz_id: int = Path(..., title="The ID of quiz"),
+    since: Optional[date] = Query(None),
+    session: AsyncSession = Depends(get_async_session),
+    user: UserId = Depends(get_current_user)
+):
+    analytics_service = AnalyticsService(session, user)
+    return await analytics_service.my_quiz_scores(quiz_id, since)
+
+
+
+
+
+# COMPANY
+@router_analytics.get('/company/{company_id}', summary="Company average score by day", response_model=ScoreSummary)
+async def company_scores(
+    company_id: int = Path(..., title="The ID of company"),
+    since: Optional[date] = Query(None),
+    session: AsyncSession = Depends(get_async_session),
+    user: UserId = Depends(get_current_user)
+):
+    try:
+        analytics_service = AnalyticsService(session, user)
+        return await analytics_service.company_scores(company_id, since)
+    except CompanyNotFoundException:
+        raise HTTPException(status_code=404, detail="Company not found.")
+    except NotPermission:
+        raise HTTPException(status_code=403, detail="Only the owner or admins can see company analytics")
+
+@router_analytics.get('/company/{company_id}/user/{user_id}', summary="Member average score by day", response_model=ScoreSummary)
+async def member_scores(
+    company_id: int = Path(..., title="The ID of company"),
+    user_id: int = Path(..., title="The ID of user"),
+    since: Optional[date] = Query(None),
+    session: AsyncSession = Depends(get_async_session),
+    user: UserId = Depends(get_current_user)
+):
+    try:
+        analytics_service = AnalyticsService(session, user)
+        return await analytics_service.member_scores(company_id, user_id, since)
+    except CompanyNotFoundException:
+        raise HTTPException(status_code=404, detail="Company not found.")
+    except NotPermission:
+        raise HTTPException(status_code=403, detail="Only the owner or admins can see company analytics")
@@ -2,9 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException, status, Security, Path
 from db.models import User
 from db.database import get_async_session
 
-from schemas.user_schema import TokenSchema, UserSchema, UserSignUp, UserEmail
+from schemas.user_schema import TokenSchema, UserSchema, UserSignUp, UserEmail, UserAuth
 from utils.auth import VerifyToken, create_access_token, get_current_user, get_token_payload
-from utils.utils import verify_password, check_existing_user, get_user_by_field
+from utils.utils import verify_password_async, check_existing_user, get_user_by_field
+from utils.user_cache import user_cache
 from sqlalchemy.ext.asyncio import AsyncSession
 from services.user_service import UserServiceCrud
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
@@ -39,19 +40,20 @@ async def login(
         )
 
     hashed_pass = user.password
-    if not verify_password(form_data.password, hashed_pass):
+    if not await verify_password_async(form_data.password, hashed_pass):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Incorrect email or password"
         )
-    
+
+    await user_cache.set(user)
     return {
         "token": create_access_token(data = {"sub": user.username,"email": user.email}),
         "token_type": "bearer"
     }
 
 
-@router_auth.get("/me", summary="Get current user", response_model=Union[UserSchema, UserEmail])
+@router_auth.get("/me", summary="Get current user", response_model=Union[UserAuth, UserSchema, UserEmail])
 async def private(
         session: AsyncSession = Depends(get_async_session),
         user: UserSchema = Depends(get_current_user),
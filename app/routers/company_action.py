@@ -16,8 +16,14 @@ from schemas.company_schema import (CompanyUsers,
     InvitationCancel,
     AddAdmin,
     RemoveAdmin,
-    UserIsNotAdmin)
+    UserIsNotAdmin,
+    BulkInvite,
+    BulkInviteResult,
+    BulkIds,
+    BulkActionResult,
+    MyCompanies)
 from utils.auth import get_current_user
+from utils.utils import PageParams
 from utils.exceptions import (UserNotFoundException, 
     InvitationOwnershipException, 
     RequestOwnershipException, 
@@ -73,7 +79,7 @@ async def remove_admin(
 
 @router_company_action.get('/admins/{company_id}', summary="Admins in company", response_model=List[CompanyUsers])
 async def list_admins(
-        page: int = 1,
+        page: PageParams = Depends(),
         company_id: int = Path(..., title="The ID of company"),
         session: AsyncSession = Depends(get_async_session),
         user: UserId = Depends(get_current_user)  
@@ -115,6 +121,21 @@ async def send_invitation(
         raise HTTPException(status_code=400, detail="An invitation has already been sent to this user for this company.")
 
 
+@router_company_action.post('/bulk/invite', summary="Owner invite many Users to company", response_model=BulkInviteResult)
+async def bulk_invite(
+        company_id: int,
+        data: BulkInvite,
+        session: AsyncSession = Depends(get_async_session),
+        user: UserId = Depends(get_current_user)
+    ):
+    '''Invites every listed user who is not a member or invited yet, with a status per user'''
+    try:
+        company_actions = CompanyActions(session, user)
+        return await company_actions.bulk_invite(data.user_ids, company_id)
+    except CompanyNotFoundException:
+        raise HTTPException(status_code=404, detail="You are not the owner of this company or company not found.")
+
+
 @router_company_action.delete('/cancel/{invitation_id}', summary="Owner cancel invite User to company", response_model=InvitationCancel)
 async def cancel_invitation(
 	invitation_id: int = Path(..., title="The ID of cancel invitation"),
@@ -168,7 +189,55 @@ async def reject_request(
 
 
 
+@router_company_action.post('/bulk/accept', summary="Owner accept many requests", response_model=BulkActionResult)
+async def bulk_accept_requests(
+        data: BulkIds,
+        session: AsyncSession = Depends(get_async_session),
+        user: UserId = Depends(get_current_user)
+    ):
+    company_actions = CompanyActions(session, user)
+    return await company_actions.bulk_accept_requests(data.ids)
+
+@router_company_action.post('/bulk/reject', summary="Owner decline many requests", response_model=BulkActionResult)
+async def bulk_reject_requests(
+        data: BulkIds,
+        session: AsyncSession = Depends(get_async_session),
+        user: UserId = Depends(get_current_user)
+    ):
+    company_actions = CompanyActions(session, user)
+    return await company_actions.bulk_reject_requests(data.ids)
+
+
+
+
+
+
+
 # user actions
+@router_company_action.post('/bulk/accept_invite', summary="User accept many invitations", response_model=BulkActionResult)
+async def bulk_accept_invitations(
+        data: BulkIds,
+        session: AsyncSession = Depends(get_async_session),
+        user: UserId = Depends(get_current_user)
+    ):
+    company_actions = CompanyActions(session, user)
+    return await company_actions.bulk_accept_invitations(data.ids)
+
+@router_company_action.post('/bulk/reject_invite', summary="User decline many invitations", response_model=BulkActionResult)
+async def bulk_reject_invitations(
+        data: BulkIds,
+        session: AsyncSession = Depends(get_async_session),
+        user: UserId = Depends(get_current_user)
+    ):
+    company_actions = CompanyActions(session, user)
+    return await company_actions.bulk_reject_invitations(data.ids)
+
+
+
+
+
+
+
 @router_company_action.post('/accept_invite/{invitation_id}', summary="User accept invitation from Owner", response_model=InvitationAccept)
 async def accept_invitation(
         invitation_id: int = Path(..., title="The ID of accepted invitation"),
@@ -281,9 +350,19 @@ async def leave_company(
         raise HTTPException(status_code=403, detail="You are not a member of this company.")
 
 
+@router_company_action.get('/my_companies/', summary="User's companies, memberships and pending items", response_model=MyCompanies)
+async def my_companies(
+        session: AsyncSession = Depends(get_async_session),
+        user: UserId = Depends(get_current_user)  
+    ):
+    '''Owned companies, memberships, invitations and requests of the user in one response'''
+    company_actions = CompanyActions(session, user)
+    return await company_actions.my_companies()
+
+
 @router_company_action.get('/requests/', summary="All user's requests", response_model=List[CompanyActionSchema])
 async def user_list_requests(
-        page: int = 1,
+        page: PageParams = Depends(),
         session: AsyncSession = Depends(get_async_session),
         user: UserId = Depends(get_current_user)  
     ):
@@ -295,7 +374,7 @@ async def user_list_requests(
 
 @router_company_action.get('/invitations/', summary="All user's invitations", response_model=List[CompanyActionSchema])
 async def user_list_invitations(
-        page: int = 1,
+        page: PageParams = Depends(),
         session: AsyncSession = Depends(get_async_session),
         user: UserId = Depends(get_current_user)  
     ):
@@ -306,7 +385,7 @@ async def user_list_invitations(
 
 @router_company_action.get('/owner_invite/', summary="All owner's invitations", response_model=List[CompanyActionSchema])
 async def owner_list_invitations(
-        page: int = 1,
+        page: PageParams = Depends(),
         session: AsyncSession = Depends(get_async_session),
         user: UserId = Depends(get_current_user)  
     ):
@@ -317,7 +396,7 @@ async def owner_list_invitations(
 
 @router_company_action.get('/requests/{company_id}', summary="Requests in company", response_model=List[CompanyActionSchema])
 async def requests_in_company(
-        page: int = 1,
+        page: PageParams = Depends(),
         company_id: int = Path(..., title="The ID of company"),
         session: AsyncSession = Depends(get_async_session),
         user: UserId = Depends(get_current_user)  
@@ -332,7 +411,7 @@ async def requests_in_company(
 
 @router_company_action.get('/users/{company_id}', summary="Users in company", response_model=List[CompanyUsers])
 async def users_in_company(
-        page: int = 1,
+        page: PageParams = Depends(),
         company_id: int = Path(..., title="The ID of company"),
         session: AsyncSession = Depends(get_async_session),
         user: UserId = Depends(get_current_user)  
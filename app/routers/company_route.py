@@ -3,6 +3,7 @@ from db.database import get_async_session
 from schemas.user_schema import UserEmail, UserId
 from schemas.company_schema import CompanySchema, CompanyCreate, CompanyUpdate
 from utils.auth import get_current_user
+from utils.utils import PageParams
 from sqlalchemy.ext.asyncio import AsyncSession
 from services.company_service import CompanyServiceCrud
 from typing import List
@@ -11,7 +12,7 @@ router_company = APIRouter(prefix="/company")
 
 @router_company.get('/all', summary="Get all Companies", response_model=List[CompanySchema])
 async def get_all_companies(
-		    page: int = 1,
+		    page: PageParams = Depends(),
         session: AsyncSession = Depends(get_async_session),
         user: UserId = Depends(get_current_user),
     ):
@@ -0,0 +1,45 @@
+from fastapi import APIRouter
+from db.database import pool_stats
+from db.redis import redis_pool_stats
+from utils.auth import token_cache
+from utils.user_cache import user_cache
+from utils.utils import password_pool
+from utils.count_cache import count_cache
+from utils.role_cache import role_cache
+from utils.permissions import path_cache
+from utils.quiz_cache import answer_key_cache, quiz_tree_cache
+from utils.my_companies_cache import my_companies_cache
+
+
+router_diagnostics = APIRouter(prefix="/diagnostics", tags=["Diagnostics"])
+
+# verified JWT payload cache
+@router_diagnostics.get("/auth/")
+async def auth_cache_stats():
+    return {
+        "token_cache": token_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "password_pool": password_pool.stats(),
+    }
+
+# async SQLAlchemy connection pool
+@router_diagnostics.get("/db/")
+async def db_pool_stats():
+    return {"pool": pool_stats()}
+
+# shared Redis connection pool
+@router_diagnostics.get("/redis/")
+async def redis_stats():
+    return {"pool": redis_pool_stats()}
+
+# shared query caches
+@router_diagnostics.get("/cache/")
+async def cache_stats():
+    return {
+        "count_cache": count_cache.stats(),
+        "role_cache": role_cache.stats(),
+        "permission_path_cache": path_cache.stats(),
+        "answer_key_cache": answer_key_cache.stats(),
+        "quiz_tree_cache": quiz_tree_cache.stats(),
+        "my_companies_cache": my_companies_cache.stats(),
+    }
@@ -0,0 +1,53 @@
+from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from fastapi.responses import StreamingResponse
+from db.database import get_async_session
+from utils.auth import get_current_user
+from sqlalchemy.ext.asyncio import AsyncSession
+from schemas.user_schema import UserId
+from services.export_service import ExportService
+from utils.exceptions import NotPermission, CompanyNotFoundException
+from typing import Optional
+
+
+router_export = APIRouter(prefix="/export", tags=["Export"])
+
+
+def attachment(filename: str) -> dict:
+    return {"Content-Disposition": f'attachment; filename="{filename}"'}
+
+
+
+# RAW QUIZ RESPONSES
+@router_export.get('/company/{company_id}/responses.csv', summary="Export recent quiz responses as CSV")
+async def export_responses_csv(
+    company_id: int = Path(..., title="The ID of company"),
+    quiz_id: Optional[int] = Query(None),
+    user_id: Optional[int] = Query(None),
+    session: AsyncSession = Depends(get_async_session),
+    user: UserId = Depends(get_current_user)
+):
+    try:
+        export_service = ExportService(session, user)
+        rows = await export_service.responses_csv(company_id, quiz_id, user_id)
+    except CompanyNotFoundException:
+        raise HTTPException(status_code=404, detail="Company not found.")
+    except NotPermission:
+        raise HTTPException(status_code=403, detail="Only the owner or admins can export responses")
+    return StreamingResponse(rows, media_type="text/csv", headers=attachment(f"company_{company_id}_responses.csv"))
+
+@router_export.get('/company/{company_id}/responses.jsonl', summary="Export recent quiz responses as JSON lines")
+async def export_responses_jsonl(
+    company_id: int = Path(..., title="The ID of company"),
+    quiz_id: Optional[int] = Query(None),
+    user_id: Optional[int] = Query(None),
+    session: AsyncSession = Depends(get_async_session),
+    user: UserId = Depends(get_current_user)
+):
+    try:
+        export_service = ExportService(session, user)
+        lines = await export_service.responses_jsonl(company_id, quiz_id, user_id)
+    except CompanyNotFoundException:
+        raise HTTPException(status_code=404, detail="Company not found.")
+    except NotPermission:
+        raise HTTPException(status_code=403, detail="Only the owner or admins can export responses")
+    return StreamingResponse(lines, media_type="application/x-ndjson", headers=attachment(f"company_{company_id}_responses.jsonl"))
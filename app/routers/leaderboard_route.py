@@ -0,0 +1,100 @@
+from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from db.database import get_async_session
+from utils.auth import get_current_user
+from sqlalchemy.ext.asyncio import AsyncSession
+from schemas.user_schema import UserId
+from schemas.leaderboard_schema import LeaderboardEntry
+from services.leaderboard_service import LeaderboardService
+from utils.exceptions import NotRanked, NotPermission, CompanyNotFoundException
+from typing import List
+
+
+router_leaderboard = APIRouter(prefix="/leaderboard", tags=["Leaderboard"])
+
+
+
+# GLOBAL
+@router_leaderboard.get('/top', summary="Top users by average score", response_model=List[LeaderboardEntry])
+async def global_top(
+    limit: int = Query(10, ge=1, le=100),
+    session: AsyncSession = Depends(get_async_session),
+    user: UserId = Depends(get_current_user)
+):
+    leaderboard_service = LeaderboardService(session, user)
+    return await leaderboard_service.top(limit)
+
+@router_leaderboard.get('/me', summary="My global rank", response_model=LeaderboardEntry)
+async def global_rank(
+    session: AsyncSession = Depends(get_async_session),
+    user: UserId = Depends(get_current_user)
+):
+    try:
+        leaderboard_service = LeaderboardService(session, user)
+        return await leaderboard_service.my_rank()
+    except NotRanked:
+        raise HTTPException(status_code=404, detail="You have no quiz results yet.")
+
+@router_leaderboard.get('/around_me', summary="Users ranked around me globally", response_model=List[LeaderboardEntry])
+async def global_around_me(
+    radius: int = Query(5, ge=1, le=50),
+    session: AsyncSession = Depends(get_async_session),
+    user: UserId = Depends(get_current_user)
+):
+    try:
+        leaderboard_service = LeaderboardService(session, user)
+        return await leaderboard_service.around_me(radius)
+    except NotRanked:
+        raise HTTPException(status_code=404, detail="You have no quiz results yet.")
+
+
+
+
+
+# COMPANY
+@router_leaderboard.get('/company/{company_id}/top', summary="Top company members by average score", response_model=List[LeaderboardEntry])
+async def company_top(
+    company_id: int = Path(..., title="The ID of company"),
+    limit: int = Query(10, ge=1, le=100),
+    session: AsyncSession = Depends(get_async_session),
+    user: UserId = Depends(get_current_user)
+):
+    try:
+        leaderboard_service = LeaderboardService(session, user)
+        return await leaderboard_service.top(limit, company_id)
+    except CompanyNotFoundException:
+        raise HTTPException(status_code=404, detail="Company not found.")
+    except NotPermission:
+        raise HTTPException(status_code=403, detail="Only members of the company can see its leaderboard")
+
+@router_leaderboard.get('/company/{company_id}/me', summary="My rank in company", response_model=LeaderboardEntry)
+async def company_rank(
+    company_id: int = Path(..., title="The ID of company"),
+    session: AsyncSession = Depends(get_async_session),
+    user: UserId = Depends(get_current_user)
+):
+    try:
+        leaderboard_service = LeaderboardService(session, user)
+        return await leaderboard_service.my_rank(company_id)
+    except CompanyNotFoundException:
+        raise HTTPException(status_code=404, detail="Company not found.")
+    except NotPermission:
+        raise HTTPException(status_code=403, detail="Only members of the company can see its leaderboard")
+    except NotRanked:
+        raise HTTPException(status_code=404, detail="You have no quiz results in this company yet.")
+
+@router_leaderboard.get('/company/{company_id}/around_me', summary="Members ranked around me in company", response_model=List[LeaderboardEntry])
+async def company_around_me(
+    company_id: int = Path(..., title="The ID of company"),
+    radius: int = Query(5, ge=1, le=50),
+    session: AsyncSession = Depends(get_async_session),
+    user: UserId = Depends(get_current_user)
+):
+    try:
+        leaderboard_service = LeaderboardService(session, user)
+        return await leaderboard_service.around_me(radius, company_id)
+    except CompanyNotFoundException:
+        raise HTTPException(status_code=404, detail="Company not found.")
+    except NotPermission:
+        raise HTTPException(status_code=403, detail="Only members of the company can see its leaderboard")
+    except NotRanked:
+        raise HTTPException(status_code=404, detail="You have no quiz results in this company yet.")
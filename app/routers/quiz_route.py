@@ -1,6 +1,7 @@
-from fastapi import APIRouter, Depends, HTTPException, Path
+from fastapi import APIRouter, Depends, HTTPException, Path, Response
 from db.database import get_async_session
 from utils.auth import get_current_user
+from utils.utils import PageParams
 from sqlalchemy.ext.asyncio import AsyncSession
 from schemas.user_schema import UserId
 from schemas.quiz_schema import (QuizBase, 
@@ -8,7 +9,17 @@ from schemas.quiz_schema import (QuizBase,
     QuizUpdate, 
     QuestionSchema, 
     QuestionUpdate,
-    AnswerUpdate)
+    AnswerUpdate,
+    QuizImport,
+    QuizFull,
+    QuizMember,
+    QuestionsImport,
+    QuizClone,
+    QuizCloneResult,
+    QuestionFull,
+    AnswerFull,
+    QuizAttempt,
+    QuizAttemptResult)
 from services.quiz_service import QuizService
 from utils.exceptions import (QuizNotFound, 
     NotPermission, 
@@ -16,8 +27,9 @@ from utils.exceptions import (QuizNotFound,
     ValuesError, 
     AnswerNotFound, 
     HasAlreadyAnswers,
-    CompanyNotFoundException)
-from typing import List
+    CompanyNotFoundException,
+    QuizAttemptTooEarly)
+from typing import List, Union
 
 
 router_quiz = APIRouter(prefix="/quiz", tags=["Quizzes"])
@@ -28,7 +40,7 @@ router_quiz = APIRouter(prefix="/quiz", tags=["Quizzes"])
 # GET QUIZZES
 @router_quiz.get('/all', summary="Get all quizzes", response_model=List[QuizBase])
 async def all_quizzes(
-    page: int = 1,
+    page: PageParams = Depends(),
     session: AsyncSession = Depends(get_async_session),
     user: UserId = Depends(get_current_user)
     ):
@@ -38,7 +50,7 @@ async def all_quizzes(
 
 @router_quiz.get('/{company_id}', summary="Get quizzes by company", response_model=List[QuizBase])
 async def get_quizzes(
-    page: int = 1,
+    page: PageParams = Depends(),
     company_id: int = Path(..., title="The ID of company"),
     session: AsyncSession = Depends(get_async_session),
     user: UserId = Depends(get_current_user)
@@ -55,6 +67,23 @@ async def get_quizzes(
 
 
 # QUIZZES
+@router_quiz.get('/{quiz_id}/full', summary="Get quiz with questions and answers", responses={200: {"model": Union[QuizFull, QuizMember]}})
+async def get_full_quiz(
+    quiz_id: int = Path(..., title="The ID of quiz"),
+    session: AsyncSession = Depends(get_async_session),
+    user: UserId = Depends(get_current_user)
+):
+    '''Answers include is_correct only for the owner and admins of the company'''
+    try:
+        quiz_service = QuizService(session, user)
+        document = await quiz_service.full_quiz(quiz_id)
+        return Response(content=document, media_type="application/json")
+    except QuizNotFound:
+        raise HTTPException(status_code=404, detail="Quiz not found.")
+    except NotPermission:
+        raise HTTPException(status_code=403, detail="Only members of the company can see this quiz")
+
+
 @router_quiz.post('/create/{company_id}', summary="Create quiz", response_model=QuizBase)
 async def create_quiz(
     quiz: QuizBase = Depends(),
@@ -70,6 +99,40 @@ async def create_quiz(
     except NotPermission:
         raise HTTPException(status_code=403, detail="You do not have permission to create this quiz")
 
+@router_quiz.post('/import/{company_id}', summary="Import quiz with questions and answers", response_model=QuizFull)
+async def import_quiz(
+    quiz: QuizImport,
+    company_id: int = Path(..., title="The ID of company"),
+    session: AsyncSession = Depends(get_async_session),
+    user: UserId = Depends(get_current_user)
+    ):
+    try:
+        quiz_service = QuizService(session, user)
+        return await quiz_service.import_quiz(company_id, quiz)
+    except CompanyNotFoundException:
+        raise HTTPException(status_code=404, detail="Company not found.")
+    except NotPermission:
+        raise HTTPException(status_code=403, detail="You do not have permission to create this quiz")
+
+@router_quiz.post('/clone/{quiz_id}', summary="Clone quiz with questions and answers", response_model=QuizCloneResult)
+async def clone_quiz(
+    data: QuizClone,
+    quiz_id: int = Path(..., title="The ID of quiz"),
+    session: AsyncSession = Depends(get_async_session),
+    user: UserId = Depends(get_current_user)
+):
+    '''Copy into the quiz's own company, or into company_id if the user administers it'''
+    try:
+        quiz_service = QuizService(session, user)
+        return await quiz_service.clone_quiz(quiz_id, data.company_id)
+    except QuizNotFound:
+        raise HTTPException(status_code=404, detail="Quiz not found.")
+    except CompanyNotFoundException:
+        raise HTTPException(status_code=404, detail="Company not found.")
+    except NotPermission:
+        raise HTTPException(status_code=403, detail="You do not have permission to clone this quiz into this company")
+
+
 @router_quiz.put('/update/{quiz_id}', summary="Update quiz", response_model=QuizUpdate)
 async def update_quiz(
     quiz: QuizUpdate = Depends(),
@@ -116,8 +179,24 @@ async def create_question(
     try:
         quiz_service = QuizService(session, user)
         return await quiz_service.create_question(quiz_id, question)
-    except QuestionNotFound:
-        raise HTTPException(status_code=404, detail="Question not found.")
+    except QuizNotFound:
+        raise HTTPException(status_code=404, detail="Quiz not found.")
+    except NotPermission:
+        raise HTTPException(status_code=403, detail="You do not have permission to add questions to this quiz")
+
+
+@router_quiz.post('/questions/{quiz_id}', summary="Create questions with answers", response_model=List[QuestionFull])
+async def create_questions(
+    data: QuestionsImport,
+    quiz_id: int = Path(..., title="The ID of quiz"),
+    session: AsyncSession = Depends(get_async_session),
+    user: UserId = Depends(get_current_user)
+):
+    try:
+        quiz_service = QuizService(session, user)
+        return await quiz_service.create_questions(quiz_id, data.questions)
+    except QuizNotFound:
+        raise HTTPException(status_code=404, detail="Quiz not found.")
     except NotPermission:
         raise HTTPException(status_code=403, detail="You do not have permission to add questions to this quiz")
 
@@ -132,7 +211,7 @@ async def update_questions(
     try:
         quiz_service = QuizService(session, user)
         return await quiz_service.update_questions(question_id, question)
-    except QuizNotFound:
+    except QuestionNotFound:
         raise HTTPException(status_code=404, detail="Question not found.")
     except NotPermission:
         raise HTTPException(status_code=403, detail="You do not have permission to update this questions")
@@ -147,7 +226,7 @@ async def delete_questions(
     try:
         quiz_service = QuizService(session, user)
         return await quiz_service.delete_questions(question_id)
-    except QuizNotFound:
+    except QuestionNotFound:
         raise HTTPException(status_code=404, detail="Question not found.")
     except NotPermission:
         raise HTTPException(status_code=403, detail="You do not have permission to delete this questions")
@@ -163,7 +242,7 @@ async def delete_questions(
 
 
 # ANSWERS
-@router_quiz.post("/answers/{question_id}", summary="Create answer", response_model=List[AnswersBase])
+@router_quiz.post("/answers/{question_id}", summary="Create answer", response_model=List[AnswerFull])
 async def create_answers(
     answers: List[AnswersBase],
     question_id: int = Path(..., title="The ID of question"),
@@ -185,6 +264,26 @@ async def create_answers(
         raise HTTPException(status_code=400, detail=str(ve))
 
 
+@router_quiz.put("/answers/replace/{question_id}", summary="Replace all answers of question", response_model=List[AnswerFull])
+async def replace_answers(
+    answers: List[AnswersBase],
+    question_id: int = Path(..., title="The ID of question"),
+    session: AsyncSession = Depends(get_async_session),
+    user: UserId = Depends(get_current_user)
+):
+    try:
+        quiz_service = QuizService(session, user)
+        return await quiz_service.replace_answers(question_id, answers)
+    except QuestionNotFound:
+        raise HTTPException(status_code=404, detail="Question not found.")
+    except NotPermission:
+        raise HTTPException(status_code=403, detail="You do not have permission to change answers of this question")
+    except ValuesError:
+        raise HTTPException(status_code=400, detail="At least two answers are required.")
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+
+
 @router_quiz.put("/answers/update/{answer_id}", summary="Update answer", response_model=AnswersBase)
 async def update_answers(
     answer: AnswerUpdate = Depends(),
@@ -214,4 +313,33 @@ async def delete_answers(
     except AnswerNotFound:
         raise HTTPException(status_code=404, detail="Answer not found.")
     except NotPermission:
-        raise HTTPException(status_code=403, detail="You do not have permission to delete this answer")
\ No newline at end of file
+        raise HTTPException(status_code=403, detail="You do not have permission to delete this answer")
+
+
+
+
+
+
+
+
+
+
+# ATTEMPTS
+@router_quiz.post("/attempt/{quiz_id}", summary="Take quiz", response_model=QuizAttemptResult)
+async def submit_attempt(
+    attempt: QuizAttempt,
+    quiz_id: int = Path(..., title="The ID of quiz"),
+    session: AsyncSession = Depends(get_async_session),
+    user: UserId = Depends(get_current_user)
+):
+    try:
+        quiz_service = QuizService(session, user)
+        return await quiz_service.submit_attempt(quiz_id, attempt)
+    except QuizNotFound:
+        raise HTTPException(status_code=404, detail="Quiz not found.")
+    except NotPermission:
+        raise HTTPException(status_code=403, detail="Only members of the company can take this quiz")
+    except QuizAttemptTooEarly:
+        raise HTTPException(status_code=400, detail="You can not take this quiz again yet.")
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
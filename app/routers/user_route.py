@@ -9,11 +9,13 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from services.user_service import UserServiceCrud
 
 from utils.auth import get_current_user
+from utils.utils import PageParams
+from utils.utils import hash_password_async
 router_user = APIRouter(prefix="/user")
 
 @router_user.get('/all', summary="Get all Users", response_model=List[UserSchema])
 async def users_list(
-        page: int = 1,
+        page: PageParams = Depends(),
         session: AsyncSession = Depends(get_async_session)
     ):
     user_service = UserServiceCrud(session)
@@ -75,7 +77,7 @@ async def edit_me(
 
     get_data = data.dict(exclude_none=True)
     if "password" in get_data:
-        get_data["password"] = hash_password(get_data["password"])
+        get_data["password"] = await hash_password_async(get_data["password"])
         
     user_service = UserServiceCrud(session)
     updated_user = await user_service.update_user(user.id, get_data)
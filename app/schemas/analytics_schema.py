@@ -0,0 +1,39 @@
+from pydantic import BaseModel
+from datetime import date
+from typing import List
+
+
+def average(correct_answers: int, total_questions: int) -> float:
+    return round(correct_answers / total_questions, 4) if total_questions else 0.0
+
+
+class ScoreBucket(BaseModel):
+    day: date
+    attempts: int
+    correct_answers: int
+    total_questions: int
+    average: float
+
+class ScoreSummary(BaseModel):
+    attempts: int
+    correct_answers: int
+    total_questions: int
+    average: float
+    history: List[ScoreBucket]
+
+    @classmethod
+    def from_buckets(cls, rows) -> "ScoreSummary":
+        '''Build from (day, attempts, correct_answers, total_questions) rows ordered by day'''
+        history = [
+            ScoreBucket(day=day, attempts=attempts, correct_answers=correct, total_questions=total, average=average(correct, total))
+            for day, attempts, correct, total in rows
+        ]
+        correct_answers = sum(bucket.correct_answers for bucket in history)
+        total_questions = sum(bucket.total_questions for bucket in history)
+        return cls(
+            attempts=sum(bucket.attempts for bucket in history),
+            correct_answers=correct_answers,
+            total_questions=total_questions,
+            average=average(correct_answers, total_questions),
+            history=history,
+        )
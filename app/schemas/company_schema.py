@@ -76,3 +76,39 @@ class LeaveCompany(CompanyActionSchema):
 class CompanyUsers(BaseModel):
     user: UserSchema
 
+
+class BulkInvite(BaseModel):
+    user_ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+class BulkInviteOutcome(BaseModel):
+    user_id: int
+    status: str  # invited, already_member, already_invited or user_not_found
+    invitation_id: Optional[int] = None
+
+class BulkInviteResult(BaseModel):
+    company_id: int
+    invited: int
+    results: List[BulkInviteOutcome]
+
+
+class BulkIds(BaseModel):
+    ids: List[int] = Field(..., min_length=1, max_length=1000)
+
+class BulkActionResult(BaseModel):
+    processed: int
+    processed_ids: List[int]
+    skipped_ids: List[int]  # not found or not yours to handle
+
+
+class CompanyMembership(CompanyName):
+    is_administrator: bool
+
+class PendingItem(BaseModel):
+    id: int
+    company: CompanyName
+
+class MyCompanies(BaseModel):
+    owned: List[CompanyName] = []
+    memberships: List[CompanyMembership] = []
+    invitations: List[PendingItem] = []  # invitations the user received
+    requests: List[PendingItem] = []  # requests the user sent
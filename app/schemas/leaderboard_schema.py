@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+
+
+class LeaderboardEntry(BaseModel):
+    user_id: int
+    rank: int
+    score: float
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, Field
-from typing import Optional, List
+from pydantic import BaseModel, Field, field_validator
+from typing import Optional, List, Dict, Tuple
+from datetime import datetime
 from schemas.user_schema import UserUsername, UserSchema
 
 class QuizBase(BaseModel):
@@ -33,5 +34,143 @@ class AnswerSchema(AnswersBase):
 class AnswerUpdate(AnswersBase):
     answer_text: Optional[str] = None
     is_correct: Optional[bool] = None
-    
 
+
+def check_answer_set(answers: List[AnswersBase]) -> List[AnswersBase]:
+    if len(answers) < 2:
+        raise ValueError("At least two answers are required.")
+    if sum(answer.is_correct for answer in answers) != 1:
+        raise ValueError("Exactly one correct answer is required.")
+    return answers
+
+
+class QuestionImport(QuestionBase):
+    answers: List[AnswersBase]
+
+    @field_validator("answers")
+    @classmethod
+    def check_answers(cls, answers: List[AnswersBase]) -> List[AnswersBase]:
+        return check_answer_set(answers)
+
+class QuizImport(QuizBase):
+    questions: List[QuestionImport] = Field(..., min_length=1)
+
+class QuestionsImport(BaseModel):
+    questions: List[QuestionImport] = Field(..., min_length=1)
+
+
+class AnswerFull(AnswersBase):
+    id: int
+
+class QuestionFull(QuestionBase):
+    id: int
+    answers: List[AnswerFull]
+
+class QuizFull(QuizBase):
+    id: int
+    company_id: int
+    questions: List[QuestionFull]
+
+class AnswerMember(BaseModel):
+    id: int
+    answer_text: str
+
+class QuestionMember(QuestionBase):
+    id: int
+    answers: List[AnswerMember]
+
+class QuizMember(QuizBase):
+    '''QuizFull as company members see it, without is_correct'''
+    id: int
+    company_id: int
+    questions: List[QuestionMember]
+
+
+class QuizClone(BaseModel):
+    company_id: Optional[int] = None
+
+class QuizCloneResult(BaseModel):
+    '''New quiz id and old -> new ids of the copied questions and answers'''
+    quiz_id: int
+    company_id: int
+    questions: Dict[int, int]
+    answers: Dict[int, int]
+
+
+class AnswerKey(BaseModel):
+    '''Quiz structure as flat arrays: question i has option_counts[i] options stored
+    consecutively in option_ids, and correct_ids[i] is its correct option (0 if none)'''
+    question_ids: List[int]
+    correct_ids: List[int]
+    option_counts: List[int]
+    option_ids: List[int]
+
+    @classmethod
+    def from_rows(cls, rows) -> "AnswerKey":
+        '''Build from (question_id, answer_id, is_correct) rows ordered by question_id'''
+        key = cls(question_ids=[], correct_ids=[], option_counts=[], option_ids=[])
+        for question_id, answer_id, is_correct in rows:
+            if not key.question_ids or key.question_ids[-1] != question_id:
+                key.question_ids.append(question_id)
+                key.correct_ids.append(0)
+                key.option_counts.append(0)
+            key.option_ids.append(answer_id)
+            key.option_counts[-1] += 1
+            if is_correct:
+                key.correct_ids[-1] = answer_id
+        return key
+
+    def grade(self, answers: Dict[int, int]) -> List[Tuple[int, int, bool]]:
+        '''Check question_id -> answer_id pairs in one pass, returns (question_id, answer_id, is_correct)'''
+        graded = []
+        offset = 0
+        for question_id, correct_id, count in zip(self.question_ids, self.correct_ids, self.option_counts):
+            answer_id = answers.pop(question_id, None)
+            if answer_id is not None:
+                if answer_id not in self.option_ids[offset:offset + count]:
+                    raise ValueError(f"Answer {answer_id} does not belong to question {question_id}.")
+                graded.append((question_id, answer_id, answer_id == correct_id))
+            offset += count
+
+        if answers:
+            raise ValueError(f"Questions {sorted(answers)} are not part of this quiz.")
+        return graded
+
+
+class AttemptAnswer(BaseModel):
+    question_id: int
+    answer_id: int
+
+class QuizAttempt(BaseModel):
+    answers: List[AttemptAnswer] = Field(..., min_length=1)
+
+    @field_validator("answers")
+    @classmethod
+    def check_unique_questions(cls, answers: List[AttemptAnswer]) -> List[AttemptAnswer]:
+        if len({answer.question_id for answer in answers}) != len(answers):
+            raise ValueError("Each question can be answered only once.")
+        return answers
+
+class QuizAttemptResult(BaseModel):
+    id: int
+    quiz_id: int
+    correct_answers: int
+    total_questions: int
+    score: float
+    created_at: datetime
+
+class GradedAnswer(BaseModel):
+    question_id: int
+    answer_id: int
+    is_correct: bool
+
+class QuizResponseRecord(BaseModel):
+    '''Raw answers of one attempt, as kept in Redis for export'''
+    result_id: int
+    user_id: int
+    company_id: int
+    quiz_id: int
+    correct_answers: int
+    total_questions: int
+    created_at: datetime
+    answers: List[GradedAnswer]
@@ -15,6 +15,15 @@ class UserSchema(UserBase):
 class UserId(UserBase):
     id: int
 
+class UserAuth(UserBase):
+    id: int
+    username: str
+    email: str
+    age: Optional[int] = None
+    description: Optional[str] = None
+    disabled: Optional[bool] = None
+    is_active: Optional[bool] = None
+
 class UserSignIn(UserBase):
     username: str
     password: str
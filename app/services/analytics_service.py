@@ -0,0 +1,67 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func
+from db.models import UserQuizDailyScore, CompanyDailyScore
+from datetime import date
+from typing import Optional
+from schemas.user_schema import UserId
+from schemas.analytics_schema import ScoreSummary
+from utils.permissions import PermissionResolver
+
+
+class AnalyticsService:
+    '''Scores read from the daily rollups, so every query is bounded by the number
+    of day buckets instead of the number of attempts'''
+
+    def __init__(
+        self, 
+        session: AsyncSession, 
+        user: UserId
+    ):
+        self.session = session
+        self.user = user
+        self.permissions = PermissionResolver(session, user)
+
+
+    async def summarize(self, model, where, since: Optional[date]) -> ScoreSummary:
+        if since is not None:
+            where = where & (model.day >= since)
+
+        statement = (
+            select(
+                model.day,
+                func.sum(model.attempts),
+                func.sum(model.correct_answers),
+                func.sum(model.total_questions),
+            )
+            .where(where)
+            .group_by(model.day)
+            .order_by(model.day)
+        )
+        result = await self.session.execute(statement)
+        return ScoreSummary.from_buckets(result.all())
+
+
+    async def my_scores(self, since: Optional[date] = None) -> ScoreSummary:
+        '''Current user's average across all quizzes'''
+        where = UserQuizDailyScore.user_id == self.user.id
+        return await self.summarize(UserQuizDailyScore, where, since)
+
+
+    async def my_quiz_scores(self, quiz_id: int, since: Optional[date] = None) -> ScoreSummary:
+        '''Current user's history for one quiz'''
+        where = (UserQuizDailyScore.user_id == self.user.id) & (UserQuizDailyScore.quiz_id == quiz_id)
+        return await self.summarize(UserQuizDailyScore, where, since)
+
+
+    async def company_scores(self, company_id: int, since: Optional[date] = None) -> ScoreSummary:
+        '''Company average, for its owner and admins'''
+        await self.permissions.company(company_id)
+        where = CompanyDailyScore.company_id == company_id
+        return await self.summarize(CompanyDailyScore, where, since)
+
+
+    async def member_scores(self, company_id: int, user_id: int, since: Optional[date] = None) -> ScoreSummary:
+        '''Member's average across the company's quizzes, for its owner and admins'''
+        await self.permissions.company(company_id)
+        where = (UserQuizDailyScore.company_id == company_id) & (UserQuizDailyScore.user_id == user_id)
+        return await self.summarize(UserQuizDailyScore, where, since)
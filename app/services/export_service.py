@@ -0,0 +1,32 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import AsyncIterator, Optional
+from schemas.user_schema import UserId
+from utils.permissions import PermissionResolver
+from utils.response_store import response_store
+
+
+class ExportService:
+    def __init__(
+        self, 
+        session: AsyncSession, 
+        user: UserId
+    ):
+        self.session = session
+        self.user = user
+        self.permissions = PermissionResolver(session, user)
+
+
+    async def responses_pattern(self, company_id: int, quiz_id: Optional[int], user_id: Optional[int]) -> str:
+        '''Only the owner and admins can export company responses'''
+        await self.permissions.company(company_id)
+        return response_store.pattern(company_id, quiz_id, user_id)
+
+
+    async def responses_csv(self, company_id: int, quiz_id: Optional[int] = None, user_id: Optional[int] = None) -> AsyncIterator[str]:
+        pattern = await self.responses_pattern(company_id, quiz_id, user_id)
+        return response_store.export_csv(company_id, pattern)
+
+
+    async def responses_jsonl(self, company_id: int, quiz_id: Optional[int] = None, user_id: Optional[int] = None) -> AsyncIterator[str]:
+        pattern = await self.responses_pattern(company_id, quiz_id, user_id)
+        return response_store.export_jsonl(company_id, pattern)
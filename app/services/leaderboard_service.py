@@ -0,0 +1,48 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+from schemas.user_schema import UserId
+from schemas.leaderboard_schema import LeaderboardEntry
+from utils.leaderboard import leaderboards, company_board, GLOBAL
+from utils.permissions import PermissionResolver
+from utils.role_cache import OWNER, ADMIN, MEMBER
+from utils.exceptions import NotRanked
+
+
+class LeaderboardService:
+    def __init__(
+        self, 
+        session: AsyncSession, 
+        user: UserId
+    ):
+        self.session = session
+        self.user = user
+        self.permissions = PermissionResolver(session, user)
+
+
+    async def board(self, company_id: Optional[int]) -> str:
+        '''Global board, or the company board for its members'''
+        if company_id is None:
+            return GLOBAL
+        await self.permissions.company(company_id, roles=(OWNER, ADMIN, MEMBER))
+        return company_board(company_id)
+
+
+    async def top(self, limit: int, company_id: Optional[int] = None) -> List[LeaderboardEntry]:
+        board = await self.board(company_id)
+        return await leaderboards.top(board, limit)
+
+
+    async def my_rank(self, company_id: Optional[int] = None) -> LeaderboardEntry:
+        board = await self.board(company_id)
+        entry = await leaderboards.rank(board, self.user.id)
+        if entry is None:
+            raise NotRanked()
+        return entry
+
+
+    async def around_me(self, radius: int, company_id: Optional[int] = None) -> List[LeaderboardEntry]:
+        board = await self.board(company_id)
+        entries = await leaderboards.around(board, self.user.id, radius)
+        if not entries:
+            raise NotRanked()
+        return entries
@@ -1,19 +1,43 @@
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, delete, update
-from sqlalchemy.orm import joinedload
-from db.models import Company, Question, CompanyUser, Quiz, Answer
-from typing import List, Dict
+from sqlalchemy import select, insert, delete, update, exists, func, literal, union_all
+from sqlalchemy.orm import selectinload
+from db.models import Company, Question, Quiz, Answer, QuizResult, QuizResultAnswer
+from datetime import timedelta
+from typing import List, Dict, Optional
 from schemas.user_schema import UserId
-from schemas.quiz_schema import QuizBase, AnswersBase, QuestionSchema
-from utils.utils import Paginate
+from schemas.quiz_schema import (QuizBase, 
+    AnswersBase, 
+    QuestionSchema, 
+    QuizImport, 
+    QuizCloneResult, 
+    QuestionImport, 
+    check_answer_set, 
+    QuizFull, 
+    QuizMember,
+    QuestionFull, 
+    AnswerFull, 
+    AnswerKey, 
+    QuizAttempt, 
+    QuizAttemptResult, 
+    QuizResponseRecord, 
+    GradedAnswer)
+from utils.utils import Paginate, PageParams
 from utils.decorators import check_if_user_or_owner
+from utils.permissions import PermissionResolver, MANAGER_ROLES
+from utils.role_cache import OWNER, ADMIN, MEMBER
+from utils.quiz_cache import answer_key_cache, quiz_tree_cache, invalidate_quiz
+from utils.leaderboard import leaderboards
+from utils.score_rollups import apply_rollups
+from utils.response_store import response_store
+from utils.retake_scheduler import schedule_retake
 from utils.exceptions import (QuizNotFound, 
     NotPermission, 
     QuestionNotFound, 
     CompanyNotFoundException, 
     HasAlreadyAnswers, 
     ValuesError, 
-    AnswerNotFound)
+    AnswerNotFound, 
+    QuizAttemptTooEarly)
 
 class QuizService:
     def __init__(
@@ -23,16 +47,17 @@ class QuizService:
     ):
         self.session = session
         self.user = user
+        self.permissions = PermissionResolver(session, user)
 
 
-    async def all_quizzes(self, page: int) -> List[QuizBase]:
+    async def all_quizzes(self, page: PageParams) -> List[QuizBase]:
         '''Get all quizzes'''
         paginator = Paginate(self.session, Quiz, page)
         paginate_quiz = await paginator.fetch_results()
         return paginate_quiz
 
 
-    async def get_quizzes(self, page: int, company_id: int) -> List[QuizBase]:
+    async def get_quizzes(self, page: PageParams, company_id: int) -> List[QuizBase]:
         '''Get quizzes by company'''
         company = await self.session.get(Company, company_id)
         if company is None:
@@ -45,6 +70,54 @@ class QuizService:
 
 
 
+    async def full_quiz(self, quiz_id: int) -> str:
+        '''Quiz with its questions and answers as JSON, for company members.
+        Loaded with three queries (quiz, questions, answers) and cached per quiz version;
+        is_correct is only included for the owner and admins.'''
+        permission = await self.permissions.quiz(quiz_id, roles=(OWNER, ADMIN, MEMBER))
+        audience = "manager" if permission.role in MANAGER_ROLES else "member"
+
+        document, version = await quiz_tree_cache.get(quiz_id, audience)
+        if document is not None:
+            return document
+
+        statement = (
+            select(Quiz)
+            .where(Quiz.id == quiz_id)
+            .options(selectinload(Quiz.questions).selectinload(Question.options))
+        )
+        result = await self.session.execute(statement)
+        quiz = result.scalar_one_or_none()
+        if quiz is None:
+            raise QuizNotFound()
+
+        quiz_full = QuizFull(
+            id=quiz.id,
+            company_id=quiz.company_id,
+            title=quiz.title,
+            description=quiz.description,
+            frequency_days=quiz.frequency_days,
+            questions=[
+                QuestionFull(
+                    id=question.id,
+                    question_text=question.question_text,
+                    answers=[
+                        AnswerFull(id=answer.id, answer_text=answer.answer_text, is_correct=bool(answer.is_correct))
+                        for answer in sorted(question.options, key=lambda answer: answer.id)
+                    ],
+                )
+                for question in sorted(quiz.questions, key=lambda question: question.id)
+            ],
+        )
+        documents = {
+            "manager": quiz_full.model_dump_json(),
+            "member": QuizMember.model_validate(quiz_full.model_dump()).model_dump_json(),
+        }
+        await quiz_tree_cache.set(quiz_id, version, documents)
+        return documents[audience]
+
+
+
     #CRUD QUIZ
     @check_if_user_or_owner # I JUST researched how custom decorator works with service
     async def create_quiz(self, company_id: int, quiz: Dict) -> QuizBase:
@@ -59,28 +132,130 @@ class QuizService:
         return new_quiz
 
 
-    async def update_quiz(self, quiz_id: int, data: Dict) -> Quiz:
-        data = data.dict(exclude_none=True)
-        quiz = await self.session.get(
-            Quiz, 
-            quiz_id,
-            options=[
-                joinedload(Quiz.company).joinedload(Company.company_users)
-            ]
+    async def import_quiz(self, company_id: int, quiz: QuizImport) -> QuizFull:
+        '''Create a quiz with all its questions and answers in one transaction'''
+        await self.permissions.company(company_id)
+
+        quiz_data = quiz.model_dump(exclude={"questions"})
+        statement = (
+            insert(Quiz)
+            .values(**quiz_data, company_id=company_id)
+            .returning(Quiz.id)
         )
-        if quiz is None:
+        inserting = await self.session.execute(statement)
+        quiz_id = inserting.scalar_one()
+
+        questions = await self.insert_questions(quiz_id, quiz.questions)
+        await self.session.commit()
+        return QuizFull(id=quiz_id, company_id=company_id, questions=questions, **quiz_data)
+
+
+    async def insert_questions(self, quiz_id: int, questions: List[QuestionImport]) -> List[QuestionFull]:
+        '''Multi-row INSERT ... RETURNING of the questions, then of all their answers'''
+        statement = insert(Question).returning(Question.id, sort_by_parameter_order=True)
+        rows = [{"question_text": question.question_text, "quiz_id": quiz_id} for question in questions]
+        inserting = await self.session.execute(statement, rows)
+        question_ids = inserting.scalars().all()
+
+        statement = insert(Answer).returning(Answer.id, sort_by_parameter_order=True)
+        rows = [
+            {**answer.model_dump(), "question_id": question_id}
+            for question_id, question in zip(question_ids, questions)
+            for answer in question.answers
+        ]
+        inserting = await self.session.execute(statement, rows)
+        answer_ids = iter(inserting.scalars().all())
+
+        return [
+            QuestionFull(
+                id=question_id,
+                question_text=question.question_text,
+                answers=[AnswerFull(id=next(answer_ids), **answer.model_dump()) for answer in question.answers],
+            )
+            for question_id, question in zip(question_ids, questions)
+        ]
+
+
+    @staticmethod
+    def next_ids(model, source):
+        '''Source ids paired with ids drawn from the model's own sequence'''
+        sequence = func.pg_get_serial_sequence(model.__tablename__, "id")
+        return select(source.id.label("old_id"), func.nextval(sequence).label("new_id"))
+
+
+    async def clone_quiz(self, quiz_id: int, company_id: Optional[int] = None) -> QuizCloneResult:
+        '''Copy a quiz with its questions and answers into the same or another company
+        the user administers. Everything runs as one INSERT ... SELECT statement with
+        data-modifying CTEs; only the old -> new id pairs come back.'''
+        permission = await self.permissions.quiz(quiz_id)
+        company_id = permission.company_id if company_id is None else company_id
+        if company_id != permission.company_id:
+            await self.permissions.company(company_id)
+
+        new_quiz = (
+            insert(Quiz)
+            .from_select(
+                ["title", "description", "frequency_days", "company_id"],
+                select(Quiz.title, Quiz.description, Quiz.frequency_days, literal(company_id))
+                .where(Quiz.id == quiz_id),
+            )
+            .returning(Quiz.id)
+            .cte("new_quiz")
+        )
+        question_ids = self.next_ids(Question, Question).where(Question.quiz_id == quiz_id).cte("question_ids")
+        new_questions = (
+            insert(Question)
+            .from_select(
+                ["id", "question_text", "quiz_id"],
+                select(question_ids.c.new_id, Question.question_text, select(new_quiz.c.id).scalar_subquery())
+                .join(question_ids, question_ids.c.old_id == Question.id),
+            )
+            .returning(Question.id)
+            .cte("new_questions")
+        )
+        answer_ids = (
+            self.next_ids(Answer, Answer)
+            .add_columns(question_ids.c.new_id.label("question_id"))
+            .join(question_ids, question_ids.c.old_id == Answer.question_id)
+            .cte("answer_ids")
+        )
+        new_answers = (
+            insert(Answer)
+            .from_select(
+                ["id", "answer_text", "is_correct", "question_id"],
+                select(answer_ids.c.new_id, Answer.answer_text, Answer.is_correct, answer_ids.c.question_id)
+                .join(answer_ids, answer_ids.c.old_id == Answer.id),
+            )
+            .returning(Answer.id)
+            .cte("new_answers")
+        )
+        statement = union_all(
+            select(literal("quiz"), literal(quiz_id), new_quiz.c.id),
+            select(literal("question"), question_ids.c.old_id, question_ids.c.new_id),
+            select(literal("answer"), answer_ids.c.old_id, answer_ids.c.new_id),
+        ).add_cte(new_questions, new_answers).execution_options(
+            writes_tables=("quizzes", "questions", "answers")
+        )
+
+        result = await self.session.execute(statement)
+        mapping = {"quiz": {}, "question": {}, "answer": {}}
+        for kind, old_id, new_id in result.all():
+            mapping[kind][old_id] = new_id
+        if quiz_id not in mapping["quiz"]:
             raise QuizNotFound()
-            
-        # check if user is admin or owner
-        admin = None
-        owner = quiz.company.owner_id == self.user.id
-        for user in quiz.company.company_users:
-            if user.user_id == self.user.id and user.is_administrator:
-                admin = user
-                break
-
-        if not owner and not admin:
-            raise NotPermission()
+
+        await self.session.commit()
+        return QuizCloneResult(
+            quiz_id=mapping["quiz"][quiz_id],
+            company_id=company_id,
+            questions=mapping["question"],
+            answers=mapping["answer"],
+        )
+
+
+    async def update_quiz(self, quiz_id: int, data: Dict) -> Quiz:
+        data = data.dict(exclude_none=True)
+        await self.permissions.quiz(quiz_id)
 
         statement = (
             update(Quiz)
@@ -89,37 +264,29 @@ class QuizService:
             .returning(Quiz)
         )
         updating = await self.session.execute(statement)
-        updated_quiz = updating.scalar_one()
+        updated_quiz = updating.scalar_one_or_none()
+        if updated_quiz is None:
+            raise QuizNotFound()
         
         await self.session.commit()
         await self.session.refresh(updated_quiz)
+        await invalidate_quiz(quiz_id)
         return updated_quiz
 
 
     async def delete_quiz(self, quiz_id: int) -> Quiz:
-        quiz = await self.session.get(
-            Quiz, 
-            quiz_id,
-            options=[
-                joinedload(Quiz.company).joinedload(Company.company_users)
-            ]
-        )
-        if quiz is None:
-            raise QuizNotFound()
-
-        admin = None
-        owner = quiz.company.owner_id == self.user.id
-        for user in quiz.company.company_users:
-            if user.user_id == self.user.id and user.is_administrator:
-                admin = user
-                break
+        await self.permissions.quiz(quiz_id)
 
-        if not owner and not admin:
-            raise NotPermission()
+        statement = delete(Quiz).where(Quiz.id == quiz_id).returning(Quiz)
+        deleting = await self.session.execute(statement)
+        deleted_quiz = deleting.scalar_one_or_none()
+        if deleted_quiz is None:
+            raise QuizNotFound()
 
-        await self.session.delete(quiz)
         await self.session.commit()
-        return quiz
+        self.permissions.forget("quiz", quiz_id)
+        await invalidate_quiz(quiz_id)
+        return deleted_quiz
 
 
 
@@ -128,58 +295,36 @@ class QuizService:
 
     #CRUD QUESTION
     async def create_question(self, quiz_id: int, question: QuestionSchema) -> QuestionSchema:
-        quiz = await self.session.get(
-            Quiz, 
-            quiz_id,
-            options=[
-            joinedload(Quiz.company).joinedload(Company.company_users)])
-        if quiz is None:
-            raise QuizNotFound()
-
-        admin = None
-        owner = quiz.company.owner_id == self.user.id
-        for user in quiz.company.company_users:
-            if user.user_id==self.user.id and user.is_administrator == True:
-                admin = user
-                break
-
-        if not owner and not admin:
-            raise NotPermission()
+        await self.permissions.quiz(quiz_id)
 
         model_dump = question.dict()
         model_dump['quiz_id'] = quiz_id
         new_question = Question(**model_dump)
         
         self.session.add(new_question)
-        await self.session.commit()
+        async with self.permissions.parent_guard("quiz", quiz_id, QuizNotFound):
+            await self.session.commit()
+        await invalidate_quiz(quiz_id)
         await self.session.refresh(new_question)
         return new_question
 
 
 
-    async def update_questions(self, question_id: int, data: Dict) -> Question:
-        data = data.dict(exclude_none=True)
-        question = await self.session.get(
-            Question, 
-            question_id,
-            options=[
-                joinedload(Question.quiz)
-                .joinedload(Quiz.company)
-                .joinedload(Company.company_users)
-            ]
-        )
-        if question is None:
-            raise QuizNotFound()
+    async def create_questions(self, quiz_id: int, questions: List[QuestionImport]) -> List[QuestionFull]:
+        '''Add questions with their answers, two multi-row inserts in one transaction'''
+        await self.permissions.quiz(quiz_id)
+
+        async with self.permissions.parent_guard("quiz", quiz_id, QuizNotFound):
+            new_questions = await self.insert_questions(quiz_id, questions)
+            await self.session.commit()
+        await invalidate_quiz(quiz_id)
+        return new_questions
+
 
-        owner = question.quiz.company.owner_id == self.user.id
-        admin = None
-        for user in question.quiz.company.company_users:
-            if user.user_id==self.user.id and user.is_administrator == True:
-                admin = user
-                break
 
-        if not owner and not admin:
-            raise NotPermission()
+    async def update_questions(self, question_id: int, data: Dict) -> Question:
+        data = data.dict(exclude_none=True)
+        permission = await self.permissions.question(question_id)
 
         statement = (
             update(Question)
@@ -189,40 +334,30 @@ class QuizService:
         )
 
         updating = await self.session.execute(statement)
-        updated_question = updating.scalar_one()
+        updated_question = updating.scalar_one_or_none()
+        if updated_question is None:
+            raise QuestionNotFound()
         
         await self.session.commit()
+        await invalidate_quiz(permission.quiz_id)
         await self.session.refresh(updated_question)
         return updated_question
 
 
 
     async def delete_questions(self, question_id: int) -> Question:
-        question = await self.session.get(
-            Question, 
-            question_id,
-            options=[
-                joinedload(Question.quiz)
-                .joinedload(Quiz.company)
-                .joinedload(Company.company_users)
-            ]
-        )
-        if question is None:
-            raise QuizNotFound()
-
-        owner = question.quiz.company.owner_id == self.user.id
-        admin = None
-        for user in question.quiz.company.company_users:
-            if user.user_id==self.user.id and user.is_administrator == True:
-                admin = user
-                break
+        permission = await self.permissions.question(question_id)
 
-        if not owner and not admin:
-            raise NotPermission()
+        statement = delete(Question).where(Question.id == question_id).returning(Question)
+        deleting = await self.session.execute(statement)
+        deleted_question = deleting.scalar_one_or_none()
+        if deleted_question is None:
+            raise QuestionNotFound()
 
-        await self.session.delete(question)
         await self.session.commit()
-        return question
+        self.permissions.forget("question", question_id)
+        await invalidate_quiz(permission.quiz_id)
+        return deleted_question
 
 
 
@@ -234,84 +369,57 @@ class QuizService:
 
 
     #CRUD ANSWERS
-    async def create_answers(self, question_id: int, answers: List[AnswersBase]) -> List[AnswersBase]:
-        question = await self.session.get(
-            Question, 
-            question_id,
-            options=[
-                joinedload(Question.quiz)
-                .joinedload(Quiz.company)
-                .joinedload(Company.company_users),
-                joinedload(Question.options)
-            ]
-        )
+    @staticmethod
+    def validate_answers(answers: List[AnswersBase]):
+        '''At least two answers and exactly one correct, checked before touching the database'''
+        if len(answers) < 2:
+            raise ValuesError()
+        check_answer_set(answers)
 
-        if question is None:
-            raise QuestionNotFound()
 
-        if question.options != []:
-            raise HasAlreadyAnswers()  
+    async def insert_answers(self, question_id: int, answers: List[AnswersBase]) -> List[AnswerFull]:
+        '''One multi-row INSERT ... RETURNING for the whole answer set'''
+        statement = insert(Answer).returning(Answer.id, sort_by_parameter_order=True)
+        rows = [{**answer.model_dump(), "question_id": question_id} for answer in answers]
+        inserting = await self.session.execute(statement, rows)
+        answer_ids = inserting.scalars().all()
+        return [AnswerFull(id=answer_id, **answer.model_dump()) for answer_id, answer in zip(answer_ids, answers)]
 
-        owner = question.quiz.company.owner_id == self.user.id
-        admin = None
-        for user in question.quiz.company.company_users:
-            if user.user_id==self.user.id and user.is_administrator == True:
-                admin = user
-            break
 
-        if not owner and not admin:
-            raise NotPermission()
+    async def create_answers(self, question_id: int, answers: List[AnswersBase]) -> List[AnswerFull]:
+        self.validate_answers(answers)
+        permission = await self.permissions.question(question_id)
 
-        #check if answers less than 2
-        if len(answers) < 2:
-            raise ValuesError()
+        statement = select(exists().where(Answer.question_id == question_id))
+        has_answers = await self.session.execute(statement)
+        if has_answers.scalar():
+            raise HasAlreadyAnswers()
 
-        correct = 0
-        new_answers = []
+        async with self.permissions.parent_guard("question", question_id, QuestionNotFound):
+            new_answers = await self.insert_answers(question_id, answers)
+            await self.session.commit()
+        await invalidate_quiz(permission.quiz_id)
+        return new_answers
 
-        for answer_data in answers:
-            model_dump = answer_data.dict()
-            model_dump['question_id'] = question_id
 
-            # check if ansvers has only one correct answer
-            if model_dump['is_correct'] == True:
-                correct += 1  
-                if correct > 1:
-                    raise ValueError("Only one correct answer is allowed")
+    async def replace_answers(self, question_id: int, answers: List[AnswersBase]) -> List[AnswerFull]:
+        '''Swap the question's whole answer set in one transaction'''
+        self.validate_answers(answers)
+        permission = await self.permissions.question(question_id)
 
-            new_answer = Answer(**model_dump)
-            self.session.add(new_answer)
-            new_answers.append(new_answer)
-        await self.session.commit()
-        return new_answers        
+        await self.session.execute(delete(Answer).where(Answer.question_id == question_id))
+        async with self.permissions.parent_guard("question", question_id, QuestionNotFound):
+            new_answers = await self.insert_answers(question_id, answers)
+            await self.session.commit()
+        await invalidate_quiz(permission.quiz_id)
+        return new_answers
 
 
 
 
     async def update_answers(self, answer_id: int, data: Dict) -> Answer:
         data = data.dict(exclude_none=True)
-        answer = await self.session.get(
-            Answer, 
-            answer_id,
-            options=[
-                joinedload(Answer.question)
-                .joinedload(Question.quiz)
-                .joinedload(Quiz.company)
-                .joinedload(Company.company_users)
-            ]
-        )
-        if answer is None:
-            raise AnswerNotFound()
-
-        owner = answer.question.quiz.company.owner_id == self.user.id
-        admin = None
-        for user in answer.question.quiz.company.company_users:
-            if user.user_id==self.user.id and user.is_administrator == True:
-                admin = user
-            break
-
-        if not owner and not admin:
-            raise NotPermission()
+        permission = await self.permissions.answer(answer_id)
 
         statement = (
             update(Answer)
@@ -321,38 +429,122 @@ class QuizService:
         )
 
         updating = await self.session.execute(statement)
-        updated_answer = updating.scalar_one()
+        updated_answer = updating.scalar_one_or_none()
+        if updated_answer is None:
+            raise AnswerNotFound()
         
         await self.session.commit()
+        await invalidate_quiz(permission.quiz_id)
         await self.session.refresh(updated_answer)
         return updated_answer
 
 
     async def delete_answers(self, answer_id: int) -> Answer:
-        answer = await self.session.get(
-            Answer, 
-            answer_id,
-            options=[
-                joinedload(Answer.question)
-                .joinedload(Question.quiz)
-                .joinedload(Quiz.company)
-                .joinedload(Company.company_users)
-            ]
-        )
-        if answer is None:
+        permission = await self.permissions.answer(answer_id)
+
+        statement = delete(Answer).where(Answer.id == answer_id).returning(Answer)
+        deleting = await self.session.execute(statement)
+        deleted_answer = deleting.scalar_one_or_none()
+        if deleted_answer is None:
             raise AnswerNotFound()
 
-        owner = answer.question.quiz.company.owner_id == self.user.id
-        admin = None
-        for user in answer.question.quiz.company.company_users:
-            if user.user_id==self.user.id and user.is_administrator == True:
-                admin = user
-            break
+        await self.session.commit()
+        self.permissions.forget("answer", answer_id)
+        await invalidate_quiz(permission.quiz_id)
+        return deleted_answer
+
+
+
+
 
-        if not owner and not admin:
-            raise NotPermission()
 
 
-        await self.session.delete(answer)
+
+
+
+    #QUIZ ATTEMPTS
+    async def load_answer_key(self, quiz_id: int) -> AnswerKey:
+        statement = (
+            select(Answer.question_id, Answer.id, Answer.is_correct)
+            .join(Question, Answer.question_id == Question.id)
+            .where(Question.quiz_id == quiz_id)
+            .order_by(Answer.question_id, Answer.id)
+        )
+        result = await self.session.execute(statement)
+        return AnswerKey.from_rows(result.all())
+
+
+    async def submit_attempt(self, quiz_id: int, attempt: QuizAttempt) -> QuizAttemptResult:
+        '''Score an answer set against the quiz's answer key in one pass and store the attempt.
+        Company members can take a quiz once every frequency_days.'''
+        permission = await self.permissions.quiz(quiz_id, roles=(OWNER, ADMIN, MEMBER))
+
+        # concurrent attempts of the same user on the same quiz queue here until the first
+        # commits, so the frequency check below always sees the previous attempt
+        await self.session.execute(select(func.pg_advisory_xact_lock(self.user.id, quiz_id)))
+
+        last_attempt = (
+            select(func.max(QuizResult.created_at))
+            .where((QuizResult.user_id == self.user.id) & (QuizResult.quiz_id == quiz_id))
+            .scalar_subquery()
+        )
+        statement = select(Quiz.frequency_days, last_attempt, func.now()).where(Quiz.id == quiz_id)
+        result = await self.session.execute(statement)
+        row = result.one_or_none()
+        if row is None:
+            raise QuizNotFound()
+
+        frequency_days, last_attempt_at, now = row
+        if frequency_days and last_attempt_at and now < last_attempt_at + timedelta(days=frequency_days):
+            raise QuizAttemptTooEarly()
+
+        answer_key = await answer_key_cache.get_or_build(quiz_id, self.load_answer_key)
+        graded = answer_key.grade({answer.question_id: answer.answer_id for answer in attempt.answers})
+        correct_answers = sum(is_correct for _, _, is_correct in graded)
+        total_questions = len(answer_key.question_ids)
+
+        statement = (
+            insert(QuizResult)
+            .values(
+                user_id=self.user.id,
+                quiz_id=quiz_id,
+                company_id=permission.company_id,
+                correct_answers=correct_answers,
+                total_questions=total_questions,
+            )
+            .returning(QuizResult.id, QuizResult.created_at)
+        )
+        inserting = await self.session.execute(statement)
+        result_id, created_at = inserting.one()
+
+        rows = [
+            {"result_id": result_id, "question_id": question_id, "answer_id": answer_id, "is_correct": is_correct}
+            for question_id, answer_id, is_correct in graded
+        ]
+        await self.session.execute(insert(QuizResultAnswer), rows)
+        await apply_rollups(self.session, QuizResult.id == result_id)
+        if frequency_days:
+            due_at = created_at + timedelta(days=frequency_days)
+            await schedule_retake(self.session, self.user.id, quiz_id, permission.company_id, due_at)
         await self.session.commit()
-        return answer
\ No newline at end of file
+        await leaderboards.record(permission.company_id, self.user.id, correct_answers, total_questions)
+        await response_store.save(QuizResponseRecord(
+            result_id=result_id,
+            user_id=self.user.id,
+            company_id=permission.company_id,
+            quiz_id=quiz_id,
+            correct_answers=correct_answers,
+            total_questions=total_questions,
+            created_at=created_at,
+            answers=[GradedAnswer(question_id=question_id, answer_id=answer_id, is_correct=is_correct)
+                for question_id, answer_id, is_correct in graded],
+        ))
+
+        return QuizAttemptResult(
+            id=result_id,
+            quiz_id=quiz_id,
+            correct_answers=correct_answers,
+            total_questions=total_questions,
+            score=correct_answers / total_questions if total_questions else 0.0,
+            created_at=created_at,
+        )
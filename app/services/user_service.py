@@ -3,8 +3,9 @@ from sqlalchemy import select, insert, delete, update
 from schemas.user_schema import UserSignUp, UserSignUpEmail, UserSchema, UserList, UserUpdate
 from db.models import User
 from typing import List, Dict
-from utils.utils import hash_password, Paginate
+from utils.utils import hash_password_async, Paginate, PageParams
 from utils.decorators import exception_handler
+from utils.user_cache import user_cache
 
 
 class UserServiceCrud:
@@ -13,7 +14,7 @@ class UserServiceCrud:
 		self.model = User
 
 	@exception_handler
-	async def get_all_users(self, page: int) -> List[User]:
+	async def get_all_users(self, page: PageParams) -> List[User]:
 		paginator = Paginate(self.session, self.model, page)
 		paginate_users = await paginator.fetch_results()
 		return paginate_users
@@ -26,7 +27,7 @@ class UserServiceCrud:
 	@exception_handler
 	async def create_user(self, user: UserSignUp) -> User:
 	    model_dump = user.model_dump()
-	    model_dump["password"] = hash_password(model_dump["password"])
+	    model_dump["password"] = await hash_password_async(model_dump["password"])
 	    new_user = User(**model_dump)
 	    self.session.add(new_user)
 
@@ -48,6 +49,7 @@ class UserServiceCrud:
         
 		await self.session.commit()
 		await self.session.refresh(updated_user)
+		await user_cache.invalidate(updated_user.email)
 		return updated_user
 
 	@exception_handler
@@ -55,5 +57,6 @@ class UserServiceCrud:
 		get_user = await self.session.get(self.model, user_id)
 		await self.session.delete(get_user)
 		await self.session.commit()
+		await user_cache.invalidate(get_user.email)
 		return get_user
 
@@ -1,4 +1,5 @@
 from typing import Optional
+from hashlib import sha256
 from core.config import settings
 from datetime import datetime, timedelta, timezone
 from jwt import encode, InvalidTokenError
@@ -11,9 +12,21 @@ from schemas.user_schema import TokenPayload
 from pydantic import ValidationError
 from utils.utils import decode_token, get_auth_user
 from utils.exceptions import UnauthenticatedException, UnauthorizedException
+from utils.cache import TTLCache
 
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
+token_cache = TTLCache(maxsize=settings.token_cache_size, ttl=settings.token_cache_ttl)
+
+def get_verified_payload(token: str) -> dict:
+    '''Decode token once and reuse the verified payload until the token expires'''
+    key = sha256(token.encode()).hexdigest()
+    payload = token_cache.get(key)
+    if payload is None:
+        payload = decode_token(token)
+        token_cache.set(key, payload, expires_at=payload.get("exp"))
+    return dict(payload)
+
 class VerifyToken:    
     async def verify(
             self,
@@ -23,7 +36,7 @@ class VerifyToken:
         if token is None:
             raise UnauthenticatedException()
         try:
-            decode_token(token.credentials)
+            get_verified_payload(token.credentials)
         except Exception as error:
             raise UnauthorizedException(str(error))
     
@@ -35,7 +48,7 @@ async def get_verified_token(token: str = Security(auth.verify)) -> str:
     return token
 
 async def get_token_payload(token: str = Security(auth.verify)) -> dict:
-    return decode_token(token)
+    return get_verified_payload(token)
 
 async def get_current_user(
         session: AsyncSession = Depends(get_async_session), 
@@ -43,7 +56,7 @@ async def get_current_user(
     ) -> User:
 
     try:
-        payload = decode_token(token)
+        payload = get_verified_payload(token)
         token_data = TokenPayload(**payload)
         if token_data.exp < datetime.now(timezone.utc):
             raise HTTPException(
@@ -0,0 +1,82 @@
+from hashlib import sha1
+from logging import getLogger
+from time import time
+from typing import Iterable
+from aioredis.exceptions import RedisError
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.config import settings
+from db.redis import get_redis
+
+logger = getLogger(__name__)
+
+
+class CountCache:
+    '''Short-lived COUNT(*) results, one Redis hash per table.
+
+    Fields are keyed by a digest of the count query and store "<count>:<expires_at>".
+    Any committed write to the table drops its hash (see db.database.get_async_session).'''
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(table: str) -> str:
+        return f"count:{table}"
+
+    async def count(self, session: AsyncSession, model: type, where=None) -> int:
+        statement = select(func.count()).select_from(model)
+        if where is not None:
+            statement = statement.where(where)
+
+        compiled = statement.compile()
+        field = sha1(f"{compiled}|{sorted(compiled.params.items())}".encode()).hexdigest()
+        key = self.key(model.__tablename__)
+        redis = get_redis()
+
+        try:
+            cached = await redis.hget(key, field)
+        except (RedisError, OSError) as error:
+            logger.warning("Count cache read failed: %s", error)
+            cached = None
+
+        if cached is not None:
+            count, expires_at = cached.split(":")
+            if float(expires_at) > time():
+                self.hits += 1
+                return int(count)
+
+        self.misses += 1
+        result = await session.execute(statement)
+        count = result.scalar_one()
+
+        try:
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.hset(key, field, f"{count}:{time() + self.ttl}")
+                pipe.expire(key, self.ttl)
+                await pipe.execute()
+        except (RedisError, OSError) as error:
+            logger.warning("Count cache write failed: %s", error)
+        return count
+
+    async def invalidate(self, tables: Iterable[str]):
+        keys = [self.key(table) for table in tables]
+        if not keys:
+            return
+        try:
+            await get_redis().delete(*keys)
+        except (RedisError, OSError) as error:
+            logger.warning("Count cache invalidation failed: %s", error)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+count_cache = CountCache(ttl=settings.count_cache_ttl)
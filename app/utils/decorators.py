@@ -1,9 +1,7 @@
 from functools import wraps
 from typing import Callable
 from logging import getLogger
-from db.models import Company
-from utils.exceptions import CompanyNotFoundException, NotPermission
-from sqlalchemy.orm import joinedload
+from utils.permissions import PermissionResolver
 
 logger = getLogger(__name__)
 def exception_handler(func: Callable) -> Callable:
@@ -21,25 +19,6 @@ def exception_handler(func: Callable) -> Callable:
 def check_if_user_or_owner(func):
     @wraps(func)
     async def wrapper(self, company_id: int, *args, **kwargs):
-        company = await self.session.get(
-            Company, 
-            company_id,
-            options=[
-                joinedload(Company.company_users)
-            ]
-        )
-        if company is None:
-            raise CompanyNotFoundException()
-
-        admin = None
-        owner = company.owner_id == self.user.id
-        for user in company.company_users:
-            if user.user_id == self.user.id and user.is_administrator:
-                admin = user
-                break
-
-        if not owner and not admin:
-            raise NotPermission()
-
+        await PermissionResolver(self.session, self.user).company(company_id)
         return await func(self, company_id, *args, **kwargs)
     return wrapper
\ No newline at end of file
@@ -82,4 +82,15 @@ class ValuesError(Exception):
 
 class HasAlreadyAnswers(Exception):
     def __init__(self):
-        super().__init__("This question have already answers.")
\ No newline at end of file
+        super().__init__("This question have already answers.")
+
+
+
+
+class QuizAttemptTooEarly(Exception):
+    def __init__(self):
+        super().__init__("You can not take this quiz again yet.")
+
+class NotRanked(Exception):
+    def __init__(self):
+        super().__init__("You have no quiz results yet.")
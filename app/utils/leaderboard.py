@@ -0,0 +1,95 @@
+from logging import getLogger
+from typing import Iterable, List, Optional, Tuple
+from aioredis import Redis
+from aioredis.client import Script
+from aioredis.exceptions import RedisError
+from db.redis import get_redis
+from schemas.leaderboard_schema import LeaderboardEntry
+
+logger = getLogger(__name__)
+
+# KEYS come in (sorted set, sums hash) pairs, ARGV is user_id, correct answers, total questions.
+# Sums are kept per scope so the score stays sum(correct) / sum(total) over all attempts.
+RECORD_ATTEMPT = """
+for i = 1, #KEYS, 2 do
+    local correct = redis.call('HINCRBY', KEYS[i + 1], ARGV[1] .. ':correct', ARGV[2])
+    local total = redis.call('HINCRBY', KEYS[i + 1], ARGV[1] .. ':total', ARGV[3])
+    if total > 0 then
+        redis.call('ZADD', KEYS[i], tostring(correct / total), ARGV[1])
+    end
+end
+return 1
+"""
+
+GLOBAL = "leaderboard:global"
+
+
+def company_board(company_id: int) -> str:
+    return f"leaderboard:company:{company_id}"
+
+def sums_key(board: str) -> str:
+    return f"{board}:sums"
+
+
+class Leaderboards:
+    '''Average score leaderboards as Redis sorted sets, one global and one per company.
+
+    Every scored attempt updates both boards with a single script call, so reads
+    never aggregate quiz results. commands.rebuild_leaderboards recomputes them
+    from the database.'''
+
+    def __init__(self):
+        self.script: Optional[Script] = None
+
+    def record_script(self, redis: Redis) -> Script:
+        if self.script is None:
+            self.script = redis.register_script(RECORD_ATTEMPT)
+        return self.script
+
+    async def add(self, client, boards: Iterable[str], user_id: int, correct_answers: int, total_questions: int):
+        '''Add an attempt to the boards, client may be a pipeline'''
+        keys = [key for board in boards for key in (board, sums_key(board))]
+        await self.record_script(get_redis())(
+            keys=keys,
+            args=[user_id, correct_answers, total_questions],
+            client=client,
+        )
+
+    async def record(self, company_id: int, user_id: int, correct_answers: int, total_questions: int):
+        try:
+            boards = (GLOBAL, company_board(company_id))
+            await self.add(get_redis(), boards, user_id, correct_answers, total_questions)
+        except (RedisError, OSError) as error:
+            logger.warning("Leaderboard update failed: %s", error)
+
+    @staticmethod
+    def entries(rows: List[Tuple[str, float]], first_rank: int) -> List[LeaderboardEntry]:
+        return [
+            LeaderboardEntry(user_id=int(user_id), rank=first_rank + index, score=score)
+            for index, (user_id, score) in enumerate(rows)
+        ]
+
+    async def top(self, board: str, limit: int) -> List[LeaderboardEntry]:
+        rows = await get_redis().zrevrange(board, 0, limit - 1, withscores=True)
+        return self.entries(rows, 1)
+
+    async def rank(self, board: str, user_id: int) -> Optional[LeaderboardEntry]:
+        async with get_redis().pipeline(transaction=False) as pipe:
+            pipe.zrevrank(board, user_id)
+            pipe.zscore(board, user_id)
+            rank, score = await pipe.execute()
+        if rank is None:
+            return None
+        return LeaderboardEntry(user_id=user_id, rank=rank + 1, score=score)
+
+    async def around(self, board: str, user_id: int, radius: int) -> List[LeaderboardEntry]:
+        redis = get_redis()
+        rank = await redis.zrevrank(board, user_id)
+        if rank is None:
+            return []
+        start = max(rank - radius, 0)
+        rows = await redis.zrevrange(board, start, rank + radius, withscores=True)
+        return self.entries(rows, start + 1)
+
+
+leaderboards = Leaderboards()
@@ -0,0 +1,64 @@
+from logging import getLogger
+from typing import Optional
+from aioredis.exceptions import RedisError
+from core.config import settings
+from db.redis import get_redis
+from schemas.company_schema import MyCompanies
+
+logger = getLogger(__name__)
+
+
+class MyCompaniesCache:
+    '''The "my companies" dashboard of each user, kept in Redis for a short TTL.
+
+    There is no in-process layer: every CompanyServiceCrud / CompanyActions method that
+    changes ownership, membership, invitations or requests drops the dashboards of the
+    users involved, and that has to be seen by all workers at once.'''
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(user_id: int) -> str:
+        return f"my_companies:{user_id}"
+
+    async def get(self, user_id: int) -> Optional[MyCompanies]:
+        try:
+            cached = await get_redis().get(self.key(user_id))
+        except (RedisError, OSError) as error:
+            logger.warning("My companies cache read failed: %s", error)
+            cached = None
+
+        if cached is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return MyCompanies.model_validate_json(cached)
+
+    async def set(self, user_id: int, dashboard: MyCompanies):
+        try:
+            await get_redis().set(self.key(user_id), dashboard.model_dump_json(), ex=self.ttl)
+        except (RedisError, OSError) as error:
+            logger.warning("My companies cache write failed: %s", error)
+
+    async def invalidate(self, *user_ids: int):
+        if not user_ids:
+            return
+        try:
+            await get_redis().delete(*(self.key(user_id) for user_id in user_ids))
+        except (RedisError, OSError) as error:
+            logger.warning("My companies cache invalidation failed: %s", error)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+my_companies_cache = MyCompaniesCache(ttl=settings.my_companies_cache_ttl)
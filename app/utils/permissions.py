@@ -0,0 +1,142 @@
+from contextlib import asynccontextmanager
+from typing import NamedTuple, Optional, Tuple, Type
+from sqlalchemy import select, exists, true, null
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.config import settings
+from db.models import Company, CompanyUser, Quiz, Question, Answer
+from schemas.user_schema import UserId
+from utils.cache import TTLCache
+from utils.role_cache import role_cache, role_from, OWNER, ADMIN
+from utils.exceptions import (NotPermission,
+    CompanyNotFoundException,
+    QuizNotFound,
+    QuestionNotFound,
+    AnswerNotFound)
+
+MANAGER_ROLES = (OWNER, ADMIN)
+
+# quizzes, questions and answers never move, so object -> (company_id, quiz_id) only goes
+# stale on delete; the worker that deletes forgets the path, other workers keep it until the TTL
+path_cache = TTLCache(maxsize=settings.permission_path_cache_size, ttl=settings.permission_path_cache_ttl)
+
+FOREIGN_KEY_VIOLATION = "23503"
+
+
+class CompanyPermission(NamedTuple):
+    company_id: int
+    quiz_id: Optional[int]
+    role: str
+
+
+class PermissionResolver:
+    '''Checks the user's role in the company an object belongs to.
+
+    On a cold cache this is a single query: the object is joined up to its company
+    and the role comes from indexed EXISTS checks on company_users, so no member lists
+    are loaded. Object paths and roles are then cached, so warm checks skip the database.'''
+
+    def __init__(self, session: AsyncSession, user: UserId):
+        self.session = session
+        self.user = user
+
+    def role_columns(self) -> Tuple:
+        membership = (CompanyUser.company_id == Company.id) & (CompanyUser.user_id == self.user.id)
+        return (
+            (Company.owner_id == self.user.id).label("is_owner"),
+            exists().where(membership & (CompanyUser.is_administrator == true())).label("is_admin"),
+            exists().where(membership).label("is_member"),
+        )
+
+    async def resolve(
+            self,
+            path_key: Optional[Tuple],
+            statement,
+            not_found: Type[Exception],
+            roles: Tuple[str, ...],
+            version: Optional[str] = None,
+        ) -> CompanyPermission:
+        path = path_cache.get(path_key) if path_key is not None else None
+        role = None
+        if path is not None:
+            role, version = await role_cache.get(path[0], self.user.id)
+        # without a version (no cached path, or Redis down) the role read below is not
+        # cached: a membership change committing meanwhile could not be detected
+
+        if role is None:
+            result = await self.session.execute(statement)
+            row = result.one_or_none()
+            if row is None:
+                raise not_found()
+
+            company_id, quiz_id, is_owner, is_admin, is_member = row
+            path = (company_id, quiz_id)
+            role = role_from(is_owner, is_admin, is_member)
+            if path_key is not None:
+                path_cache.set(path_key, path)
+            await role_cache.set(role, company_id, self.user.id, version=version)
+
+        if role not in roles:
+            raise NotPermission()
+        return CompanyPermission(path[0], path[1], role)
+
+    async def company(self, company_id: int, not_found=CompanyNotFoundException, roles=MANAGER_ROLES) -> CompanyPermission:
+        role, version = await role_cache.get(company_id, self.user.id)
+        if role is not None:
+            if role not in roles:
+                raise NotPermission()
+            return CompanyPermission(company_id, None, role)
+
+        statement = (
+            select(Company.id, null(), *self.role_columns())
+            .where(Company.id == company_id)
+        )
+        return await self.resolve(None, statement, not_found, roles, version)
+
+    async def quiz(self, quiz_id: int, not_found=QuizNotFound, roles=MANAGER_ROLES) -> CompanyPermission:
+        statement = (
+            select(Company.id, Quiz.id, *self.role_columns())
+            .select_from(Quiz)
+            .join(Company, Quiz.company_id == Company.id)
+            .where(Quiz.id == quiz_id)
+        )
+        return await self.resolve(("quiz", quiz_id), statement, not_found, roles)
+
+    async def question(self, question_id: int, not_found=QuestionNotFound, roles=MANAGER_ROLES) -> CompanyPermission:
+        statement = (
+            select(Company.id, Quiz.id, *self.role_columns())
+            .select_from(Question)
+            .join(Quiz, Question.quiz_id == Quiz.id)
+            .join(Company, Quiz.company_id == Company.id)
+            .where(Question.id == question_id)
+        )
+        return await self.resolve(("question", question_id), statement, not_found, roles)
+
+    async def answer(self, answer_id: int, not_found=AnswerNotFound, roles=MANAGER_ROLES) -> CompanyPermission:
+        statement = (
+            select(Company.id, Quiz.id, *self.role_columns())
+            .select_from(Answer)
+            .join(Question, Answer.question_id == Question.id)
+            .join(Quiz, Question.quiz_id == Quiz.id)
+            .join(Company, Quiz.company_id == Company.id)
+            .where(Answer.id == answer_id)
+        )
+        return await self.resolve(("answer", answer_id), statement, not_found, roles)
+
+    @staticmethod
+    def forget(kind: str, object_id: int):
+        path_cache.pop((kind, object_id))
+
+    @asynccontextmanager
+    async def parent_guard(self, kind: str, object_id: int, not_found: Type[Exception]):
+        '''Wraps a write under a checked object. If another worker deleted the object while
+        its path was still cached here, the foreign key of the write fails; that is
+        reported as not_found instead of a 500.'''
+        try:
+            yield
+        except IntegrityError as error:
+            if getattr(error.orig, "pgcode", None) != FOREIGN_KEY_VIOLATION:
+                raise
+            await self.session.rollback()
+            self.forget(kind, object_id)
+            raise not_found() from error
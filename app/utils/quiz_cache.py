@@ -0,0 +1,125 @@
+from logging import getLogger
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from aioredis.exceptions import RedisError
+from core.config import settings
+from db.redis import get_redis
+from schemas.quiz_schema import AnswerKey
+from utils.tiered_cache import TieredCache, model_codec
+
+logger = getLogger(__name__)
+
+
+def version_key(quiz_id: int) -> str:
+    return f"quiz:{quiz_id}:version"
+
+
+async def read_version(quiz_id: int) -> Optional[str]:
+    '''Current quiz version, None if Redis is unavailable'''
+    try:
+        return await get_redis().get(version_key(quiz_id)) or "0"
+    except (RedisError, OSError) as error:
+        logger.warning("Quiz version read failed: %s", error)
+        return None
+
+
+async def invalidate_quiz(quiz_id: int):
+    '''Bump the quiz version after any change to the quiz, its questions or answers.
+
+    Cached entries, in Redis and in process memory, are stored under the version read
+    before they were built. A build racing with a change lands under the old version,
+    which no worker reads once the bump is visible, and old entries simply expire.'''
+    try:
+        await get_redis().incr(version_key(quiz_id))
+    except (RedisError, OSError) as error:
+        logger.warning("Quiz version bump failed: %s", error)
+
+
+class AnswerKeyCache:
+    '''Compiled answer keys per quiz version, in process memory in front of Redis.
+
+    The version is read from Redis on every lookup, so the in-process layer never serves
+    a key older than the last change. While Redis is unavailable the key is rebuilt from
+    the database each time.'''
+
+    def __init__(self, ttl: int, local_size: int, local_ttl: int):
+        self.entries = TieredCache(
+            name="Answer key",
+            key=self.key,
+            version_key=version_key,
+            codec=model_codec(AnswerKey),
+            ttl=ttl,
+            local_size=local_size,
+            local_ttl=local_ttl,
+        )
+
+    @staticmethod
+    def key(quiz_id: int, version: str) -> str:
+        return f"quiz:{quiz_id}:answer_key:{version}"
+
+    async def get_or_build(self, quiz_id: int, build: Callable[[int], Awaitable[AnswerKey]]) -> AnswerKey:
+        answer_key, version = await self.entries.get(quiz_id)
+        if answer_key is None:
+            answer_key = await build(quiz_id)
+            await self.entries.set(answer_key, quiz_id, version=version)
+        return answer_key
+
+    def stats(self) -> dict:
+        return self.entries.stats()
+
+
+class QuizTreeCache:
+    '''Serialized GET /quiz/{id}/full responses per quiz version and audience
+    ("manager" documents include is_correct, "member" ones do not)'''
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(quiz_id: int, version: str, audience: str) -> str:
+        return f"quiz:{quiz_id}:full:{version}:{audience}"
+
+    async def get(self, quiz_id: int, audience: str) -> Tuple[Optional[str], Optional[str]]:
+        '''Returns (document, version), the version to store a rebuilt document under'''
+        version = await read_version(quiz_id)
+        document = None
+        if version is not None:
+            try:
+                document = await get_redis().get(self.key(quiz_id, version, audience))
+            except (RedisError, OSError) as error:
+                logger.warning("Quiz tree cache read failed: %s", error)
+
+        if document is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return document, version
+
+    async def set(self, quiz_id: int, version: Optional[str], documents: Dict[str, str]):
+        if version is None:
+            return
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                for audience, document in documents.items():
+                    pipe.set(self.key(quiz_id, version, audience), document, ex=self.ttl)
+                await pipe.execute()
+        except (RedisError, OSError) as error:
+            logger.warning("Quiz tree cache write failed: %s", error)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+answer_key_cache = AnswerKeyCache(
+    ttl=settings.answer_key_cache_ttl,
+    local_size=settings.answer_key_local_size,
+    local_ttl=settings.answer_key_local_ttl,
+)
+
+quiz_tree_cache = QuizTreeCache(ttl=settings.quiz_tree_cache_ttl)
@@ -0,0 +1,106 @@
+import csv
+import io
+import json
+from fnmatch import fnmatchcase
+from logging import getLogger
+from typing import AsyncIterator, List, Optional
+from aioredis.exceptions import RedisError
+from core.config import settings
+from db.redis import get_redis
+from schemas.quiz_schema import QuizResponseRecord
+
+logger = getLogger(__name__)
+
+CSV_COLUMNS = ("result_id", "user_id", "company_id", "quiz_id", "created_at", "question_id", "answer_id", "is_correct")
+
+
+class ResponseStore:
+    '''Raw answers of recent attempts, one Redis string per attempt that expires after ttl.
+
+    Keys are responses:<company_id>:<quiz_id>:<user_id>:<result_id>, so a company,
+    a quiz or a user within a company is a key pattern. Every key is also indexed in
+    responses_index:<company_id>, a sorted set scored by result id: exports page
+    through the index in result id order with one MGET per batch and never touch the
+    database, and each attempt is read exactly once while holding one batch in memory.
+    Members of expired attempts are dropped from the index when an export meets them.'''
+
+    def __init__(self, ttl: int, batch_size: int):
+        self.ttl = ttl
+        self.batch_size = batch_size
+
+    @staticmethod
+    def key(record: QuizResponseRecord) -> str:
+        return f"responses:{record.company_id}:{record.quiz_id}:{record.user_id}:{record.result_id}"
+
+    @staticmethod
+    def index(company_id: int) -> str:
+        return f"responses_index:{company_id}"
+
+    @staticmethod
+    def pattern(company_id: int, quiz_id: Optional[int] = None, user_id: Optional[int] = None) -> str:
+        quiz = "*" if quiz_id is None else quiz_id
+        user = "*" if user_id is None else user_id
+        return f"responses:{company_id}:{quiz}:{user}:*"
+
+    async def save(self, record: QuizResponseRecord):
+        key = self.key(record)
+        index = self.index(record.company_id)
+        try:
+            async with get_redis().pipeline(transaction=False) as pipe:
+                pipe.set(key, record.model_dump_json(), ex=self.ttl)
+                pipe.zadd(index, {key: record.result_id})
+                pipe.expire(index, self.ttl)
+                await pipe.execute()
+        except (RedisError, OSError) as error:
+            logger.warning("Quiz response write failed: %s", error)
+
+    async def batches(self, company_id: int, pattern: str) -> AsyncIterator[List[str]]:
+        '''Stored JSON documents of the company matching pattern, in result id order'''
+        redis = get_redis()
+        index = self.index(company_id)
+        after = "-inf"
+        while True:
+            rows = await redis.zrangebyscore(index, after, "+inf", start=0, num=self.batch_size, withscores=True)
+            if not rows:
+                return
+            after = f"({int(rows[-1][1])}"
+            keys = [key for key, _ in rows if fnmatchcase(key, pattern)]
+            if not keys:
+                continue
+            values = await redis.mget(keys)
+            expired = [key for key, value in zip(keys, values) if value is None]
+            if expired:
+                await redis.zrem(index, *expired)
+            yield [value for value in values if value is not None]
+
+    async def export_jsonl(self, company_id: int, pattern: str) -> AsyncIterator[str]:
+        async for batch in self.batches(company_id, pattern):
+            if batch:
+                yield "\n".join(batch) + "\n"
+
+    async def export_csv(self, company_id: int, pattern: str) -> AsyncIterator[str]:
+        '''One row per answered question'''
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(CSV_COLUMNS)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+        async for batch in self.batches(company_id, pattern):
+            for document in batch:
+                record = json.loads(document)
+                for answer in record["answers"]:
+                    writer.writerow((
+                        record["result_id"], record["user_id"], record["company_id"], record["quiz_id"],
+                        record["created_at"], answer["question_id"], answer["answer_id"], answer["is_correct"],
+                    ))
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+
+response_store = ResponseStore(
+    ttl=settings.quiz_responses_ttl,
+    batch_size=settings.export_batch_size,
+)
@@ -0,0 +1,109 @@
+import asyncio
+from datetime import datetime
+from logging import getLogger
+from sqlalchemy import select, delete, exists, func, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from core.config import settings
+from db.database import async_session
+from db.models import QuizRetake, Notification, Quiz, Company, CompanyUser
+
+logger = getLogger(__name__)
+
+
+async def schedule_retake(session: AsyncSession, user_id: int, quiz_id: int, company_id: int, due_at: datetime):
+    '''Set (or move) the user's next due time for the quiz, in the caller's transaction'''
+    statement = insert(QuizRetake).values(
+        user_id=user_id,
+        quiz_id=quiz_id,
+        company_id=company_id,
+        next_due_at=due_at,
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=["user_id", "quiz_id"],
+        set_={"next_due_at": statement.excluded.next_due_at},
+    )
+    await session.execute(statement)
+
+
+class RetakeScheduler:
+    '''Turns due quiz_retakes rows into notifications.
+
+    Each batch is one statement: the earliest due rows are claimed through the
+    next_due_at index with FOR UPDATE SKIP LOCKED, deleted, and inserted into
+    notifications for users who are still in the company. Workers never hold more
+    than a count in memory and several of them can run side by side.'''
+
+    def __init__(self, batch_size: int, interval: float):
+        self.batch_size = batch_size
+        self.interval = interval
+
+    def batch_statement(self):
+        due = (
+            select(QuizRetake.id)
+            .where(QuizRetake.next_due_at <= func.now())
+            .order_by(QuizRetake.next_due_at)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+            .cte("due")
+        )
+        claimed = (
+            delete(QuizRetake)
+            .where(QuizRetake.id.in_(select(due.c.id)))
+            .returning(QuizRetake.user_id, QuizRetake.quiz_id, QuizRetake.company_id)
+            .cte("claimed")
+        )
+        still_member = or_(
+            exists().where((CompanyUser.company_id == claimed.c.company_id) & (CompanyUser.user_id == claimed.c.user_id)),
+            exists().where((Company.id == claimed.c.company_id) & (Company.owner_id == claimed.c.user_id)),
+        )
+        notified = (
+            insert(Notification)
+            .from_select(
+                ["user_id", "company_id", "quiz_id", "message"],
+                select(
+                    claimed.c.user_id,
+                    claimed.c.company_id,
+                    claimed.c.quiz_id,
+                    func.concat("Time to retake the quiz: ", Quiz.title),
+                )
+                .join(Quiz, Quiz.id == claimed.c.quiz_id)
+                .where(still_member),
+            )
+            .returning(Notification.id)
+            .cte("notified")
+        )
+        return select(
+            select(func.count()).select_from(claimed).scalar_subquery(),
+            select(func.count()).select_from(notified).scalar_subquery(),
+        )
+
+    async def run_once(self) -> int:
+        '''Process batches until nothing is due, returns the number of notifications'''
+        total = 0
+        while True:
+            async with async_session() as session:
+                result = await session.execute(self.batch_statement())
+                claimed, notified = result.one()
+                await session.commit()
+            total += notified
+            if claimed < self.batch_size:
+                return total
+
+    async def run_forever(self):
+        while True:
+            try:
+                notified = await self.run_once()
+                if notified:
+                    logger.info("Sent %s retake notifications", notified)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Retake scheduler batch failed")
+            await asyncio.sleep(self.interval)
+
+
+retake_scheduler = RetakeScheduler(
+    batch_size=settings.retake_batch_size,
+    interval=settings.retake_interval,
+)
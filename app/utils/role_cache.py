@@ -0,0 +1,31 @@
+from core.config import settings
+from utils.tiered_cache import TieredCache, TEXT
+
+OWNER = "owner"
+ADMIN = "admin"
+MEMBER = "member"
+NO_ROLE = "none"
+
+
+def role_from(is_owner: bool, is_admin: bool, is_member: bool) -> str:
+    if is_owner:
+        return OWNER
+    if is_admin:
+        return ADMIN
+    if is_member:
+        return MEMBER
+    return NO_ROLE
+
+
+# User roles per company: one key roles:<company_id>:<user_id>:<version> per user. Every
+# membership change bumps roles:<company_id>:version (role_cache.invalidate(company_id)),
+# so a role read from the database while a change commits is never served.
+role_cache = TieredCache(
+    name="Role",
+    key=lambda company_id, user_id, version: f"roles:{company_id}:{user_id}:{version}",
+    version_key=lambda company_id: f"roles:{company_id}:version",
+    codec=TEXT,
+    ttl=settings.role_cache_ttl,
+    local_size=settings.role_cache_local_size,
+    local_ttl=settings.role_cache_local_ttl,
+)
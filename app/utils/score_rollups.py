@@ -0,0 +1,42 @@
+from typing import List
+from sqlalchemy import select, func, cast, Date
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.models import QuizResult, UserQuizDailyScore, CompanyDailyScore
+
+SUMS = ("attempts", "correct_answers", "total_questions")
+
+
+def increment_rollup(model, columns: List[str], bucket: List[str], source) -> insert:
+    '''INSERT ... SELECT that adds the selected sums to existing buckets'''
+    statement = insert(model).from_select([*columns, *SUMS], source)
+    return statement.on_conflict_do_update(
+        index_elements=bucket,
+        set_={column: getattr(model, column) + getattr(statement.excluded, column) for column in SUMS},
+    )
+
+
+def rollup_statements(where) -> List[insert]:
+    '''Statements folding the quiz_results matching where into the daily buckets'''
+    day = cast(QuizResult.created_at, Date)
+    sums = (func.count(), func.sum(QuizResult.correct_answers), func.sum(QuizResult.total_questions))
+
+    by_user = (
+        select(QuizResult.user_id, QuizResult.quiz_id, QuizResult.company_id, day, *sums)
+        .where(where)
+        .group_by(QuizResult.user_id, QuizResult.quiz_id, QuizResult.company_id, day)
+    )
+    by_company = (
+        select(QuizResult.company_id, day, *sums)
+        .where(where)
+        .group_by(QuizResult.company_id, day)
+    )
+    return [
+        increment_rollup(UserQuizDailyScore, ["user_id", "quiz_id", "company_id", "day"], ["user_id", "quiz_id", "day"], by_user),
+        increment_rollup(CompanyDailyScore, ["company_id", "day"], ["company_id", "day"], by_company),
+    ]
+
+
+async def apply_rollups(session: AsyncSession, where):
+    for statement in rollup_statements(where):
+        await session.execute(statement)
@@ -0,0 +1,118 @@
+from logging import getLogger
+from typing import Any, Callable, NamedTuple, Optional, Tuple, Type
+from aioredis.exceptions import RedisError
+from pydantic import BaseModel
+from db.redis import get_redis
+from utils.cache import TTLCache
+
+logger = getLogger(__name__)
+
+
+class Codec(NamedTuple):
+    dumps: Callable[[Any], str]
+    loads: Callable[[str], Any]
+
+TEXT = Codec(str, str)
+
+def model_codec(model: Type[BaseModel]) -> Codec:
+    return Codec(lambda value: value.model_dump_json(), model.model_validate_json)
+
+
+class TieredCache:
+    '''Values in short-lived process memory in front of Redis.
+
+    Entries are addressed by parts; key(*parts) is the Redis key and codec turns values
+    into strings and back. Redis errors are logged and treated as a miss, so callers
+    always fall back to the database.
+
+    With version_key, entries are versioned per scope (their first part): lookups read
+    the scope's current version first and only see entries stored under it, passed to
+    key as the last part. invalidate bumps the version, which drops the whole scope in
+    every worker at once, and a value built while a bump lands is stored under the old
+    version, so it is never served.'''
+
+    def __init__(
+            self,
+            name: str,
+            key: Callable[..., str],
+            codec: Codec,
+            ttl: int,
+            local_size: int,
+            local_ttl: int,
+            version_key: Optional[Callable[[Any], str]] = None,
+        ):
+        self.name = name
+        self.key = key
+        self.codec = codec
+        self.ttl = ttl
+        self.version_key = version_key
+        self.local = TTLCache(maxsize=local_size, ttl=local_ttl)
+        self.redis_hits = 0
+        self.misses = 0
+
+    def entry(self, parts: Tuple, version: str) -> Tuple:
+        return parts if self.version_key is None else (*parts, version)
+
+    async def get(self, *parts) -> Tuple[Any, Optional[str]]:
+        '''Returns (value, version). A value rebuilt after a miss is stored with
+        set(..., version=version); the version is None while Redis is unavailable.'''
+        version = ""
+        if self.version_key is not None:
+            try:
+                version = await get_redis().get(self.version_key(parts[0])) or "0"
+            except (RedisError, OSError) as error:
+                logger.warning("%s cache read failed: %s", self.name, error)
+                self.misses += 1
+                return None, None
+
+        entry = self.entry(parts, version)
+        value = self.local.get(entry)
+        if value is not None:
+            return value, version
+
+        try:
+            cached = await get_redis().get(self.key(*entry))
+        except (RedisError, OSError) as error:
+            logger.warning("%s cache read failed: %s", self.name, error)
+            cached = None
+
+        if cached is None:
+            self.misses += 1
+            return None, version
+
+        self.redis_hits += 1
+        value = self.codec.loads(cached)
+        self.local.set(entry, value)
+        return value, version
+
+    async def set(self, value, *parts, version: Optional[str] = ""):
+        if version is None:
+            return
+        entry = self.entry(parts, version)
+        self.local.set(entry, value)
+        try:
+            await get_redis().set(self.key(*entry), self.codec.dumps(value), ex=self.ttl)
+        except (RedisError, OSError) as error:
+            logger.warning("%s cache write failed: %s", self.name, error)
+
+    async def invalidate(self, *parts):
+        '''Drop the entry, or with version_key every entry of the scope parts[0]'''
+        try:
+            if self.version_key is not None:
+                await get_redis().incr(self.version_key(parts[0]))
+            else:
+                self.local.pop(parts)
+                await get_redis().delete(self.key(*parts))
+        except (RedisError, OSError) as error:
+            logger.warning("%s cache invalidation failed: %s", self.name, error)
+
+    def stats(self) -> dict:
+        local = self.local.stats()
+        lookups = local["hits"] + self.redis_hits + self.misses
+        hits = local["hits"] + self.redis_hits
+        return {
+            "local": local,
+            "redis_hits": self.redis_hits,
+            "misses": self.misses,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,47 @@
+from typing import Optional
+from core.config import settings
+from db.models import User
+from schemas.user_schema import UserAuth
+from utils.tiered_cache import TieredCache, model_codec
+
+
+class UserIdentityCache:
+    '''Authenticated users by email: short-lived process memory in front of Redis.
+
+    Only the UserAuth fields are stored - never the password hash.'''
+
+    def __init__(self, ttl: int, local_size: int, local_ttl: int):
+        self.entries = TieredCache(
+            name="User",
+            key=self.key,
+            codec=model_codec(UserAuth),
+            ttl=ttl,
+            local_size=local_size,
+            local_ttl=local_ttl,
+        )
+
+    @staticmethod
+    def key(email: str) -> str:
+        return f"user:email:{email}"
+
+    async def get(self, email: str) -> Optional[UserAuth]:
+        user, _ = await self.entries.get(email)
+        return user
+
+    async def set(self, user: User) -> UserAuth:
+        user = UserAuth.model_validate(user, from_attributes=True)
+        await self.entries.set(user, user.email)
+        return user
+
+    async def invalidate(self, email: str):
+        await self.entries.invalidate(email)
+
+    def stats(self) -> dict:
+        return self.entries.stats()
+
+
+user_cache = UserIdentityCache(
+    ttl=settings.user_cache_ttl,
+    local_size=settings.user_cache_local_size,
+    local_ttl=settings.user_cache_local_ttl,
+)
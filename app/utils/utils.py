@@ -1,62 +1,177 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+import json
+from base64 import urlsafe_b64encode, urlsafe_b64decode
+from typing import Annotated, Callable, Optional
 from passlib.context import CryptContext
 from sqlalchemy import select, Column
 from core.config import settings
 from db.models import User, Company
 from core.config import settings
-from fastapi import HTTPException, status
+from fastapi import HTTPException, Query, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from jwt import decode, encode, InvalidTokenError
+from jwt import decode, encode, InvalidTokenError, InvalidAudienceError
 from pydantic import ValidationError
 from schemas.user_schema import UserEmail
+from utils.user_cache import user_cache
+from utils.count_cache import count_cache
 
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+class BlockingPool:
+    '''Runs blocking calls in a dedicated thread pool so they never stall the event loop.
+
+    At most max_workers calls run at once, the rest wait in the executor queue.'''
+
+    def __init__(self, max_workers: int, name: str):
+        self.max_workers = max_workers
+        self.name = name
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.max_queue_depth = 0
+        self._lock = Lock()
+
+    async def run(self, func: Callable, *args):
+        with self._lock:
+            self.queued += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queued)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._call, func, args)
+
+    def _call(self, func: Callable, args: tuple):
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+        try:
+            return func(*args)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+
+    def shutdown(self):
+        # threads start lazily, so the fresh executor costs nothing until the app starts again
+        executor, self.executor = self.executor, ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix=self.name)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "queue_depth": self.queued,
+            "max_queue_depth": self.max_queue_depth,
+            "running": self.running,
+            "completed": self.completed,
+        }
+
+password_pool = BlockingPool(settings.password_hash_workers, "bcrypt")
+
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(password: str, hashed_pass: str) -> bool:
     return pwd_context.verify(password, hashed_pass)
 
-def decode_token(token: str):
+async def hash_password_async(password: str) -> str:
+    return await password_pool.run(hash_password, password)
+
+async def verify_password_async(password: str, hashed_pass: str) -> bool:
+    return await password_pool.run(verify_password, password, hashed_pass)
+
+def _validate_auth0_claims(payload: dict):
+    audience = payload.get("aud")
+    audiences = [audience] if isinstance(audience, str) else audience or []
+    if settings.AUTH0_API_AUDIENCE not in audiences:
+        raise InvalidAudienceError("Invalid audience")
+
+def _validate_local_claims(payload: dict):
+    if "aud" in payload:
+        raise InvalidAudienceError("Invalid audience")
+
+TOKEN_CLAIM_VALIDATORS = {
+    "auth0": _validate_auth0_claims,
+    "local": _validate_local_claims,
+}
+
+def get_token_type(payload: dict) -> str:
+    '''Tokens issued by Auth0 carry its issuer, everything else comes from create_access_token'''
+    if payload.get("iss") == settings.AUTH0_ISSUER:
+        return "auth0"
+    return "local"
+
+def decode_token(token: str) -> dict:
+    '''Verify the signature once, then check the claims required by the token's issuer'''
+    payload = decode(
+        token,
+        settings.SIGNING_KEY,
+        algorithms=settings.AUTH0_ALGORITHMS,
+        options={"verify_aud": False},
+    )
+    TOKEN_CLAIM_VALIDATORS[get_token_type(payload)](payload)
+    return payload
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+def encode_cursor(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> list:
     try:
-        payload = decode(
-            token,
-            settings.SIGNING_KEY,
-            algorithms=settings.AUTH0_ALGORITHMS,
-            audience=settings.AUTH0_API_AUDIENCE,
-            issuer=settings.AUTH0_ISSUER,
-        )
-
-        return payload
-    except (InvalidTokenError, ValidationError):
-        payload_without_auth0 = decode(
-            token,
-            settings.SIGNING_KEY,
-            algorithms=settings.AUTH0_ALGORITHMS,
-        )
-        return payload_without_auth0
-    except (InvalidTokenError, ValidationError):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Could not decode token",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        values = json.loads(urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError):
+        values = None
+    if not isinstance(values, list) or not values:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return values
+
+class PageParams:
+    '''Query parameters of list endpoints: a page number, or the cursor returned
+    in the X-Next-Cursor header of the previous page. limit is capped at page_size_max,
+    with_total adds an X-Total-Count header.'''
+
+    def __init__(
+            self,
+            response: Response,
+            page: int = 1,
+            cursor: Optional[str] = None,
+            limit: Annotated[Optional[int], Query(ge=1)] = None,
+            with_total: bool = False,
+        ):
+        self.response = response
+        self.page = page
+        self.cursor = decode_cursor(cursor) if cursor else None
+        self.limit = min(limit or settings.page_size_default, settings.page_size_max)
+        self.with_total = with_total
+
+    def set_next_cursor(self, cursor: str):
+        if self.response is not None:
+            self.response.headers[NEXT_CURSOR_HEADER] = cursor
+
+    def set_total(self, total: int):
+        if self.response is not None:
+            self.response.headers[TOTAL_COUNT_HEADER] = str(total)
 
 class Paginate:
-    def __init__(self, db: AsyncSession, model: type, page: int, options=None, where=None):
+    def __init__(self, db: AsyncSession, model: type, page: PageParams, options=None, where=None):
         self.db = db
         self.model = model
         self.page = page
         self.options = options
         self.where = where
-        self.COUNT = 3
+        self.COUNT = page.limit
+
+    def after_cursor(self, values: list):
+        # the cursor holds the id of the last row returned
+        if len(values) != 1 or type(values[0]) is not int:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+        return self.model.id > values[0]
 
     async def fetch_results(self):
-        if self.page is None or self.page < 1:
-            self.page = 1
-        
-        offset = (self.page - 1) * self.COUNT
         limit = self.COUNT
 
         statement = select(self.model)
@@ -66,10 +181,24 @@ class Paginate:
         if self.where is not None:
             statement = statement.where(self.where)
 
-        
-        statement = statement.offset(offset).limit(limit)
+        # keyset mode costs the same on every page, page mode is kept for compatibility
+        if self.page.cursor is not None:
+            statement = statement.where(self.after_cursor(self.page.cursor))
+        else:
+            page = self.page.page if self.page.page is not None and self.page.page > 1 else 1
+            statement = statement.offset((page - 1) * limit)
+
+        # one extra row tells whether there is a next page
+        statement = statement.order_by(self.model.id).limit(limit + 1)
         result = await self.db.execute(statement)
-        return result.scalars().all()
+        rows = result.scalars().all()
+
+        results = rows[:limit]
+        if len(rows) > limit:
+            self.page.set_next_cursor(encode_cursor([results[-1].id]))
+        if self.page.with_total:
+            self.page.set_total(await count_cache.count(self.db, self.model, self.where))
+        return results
 
 async def check_existing_user(session, field, value):
     existing_user = await session.execute(select(User).where(field == value))
@@ -82,8 +211,12 @@ async def get_user_by_field(session: AsyncSession, field: Column, value: str) ->
     return user.scalar_one_or_none()
 
 async def get_auth_user(session, email):
+    cached_user = await user_cache.get(email)
+    if cached_user:
+        return cached_user
+
     user_in_db = await get_user_by_field(session, User.email, email)
     if user_in_db:
-        return user_in_db
+        return await user_cache.set(user_in_db)
     else:
         return UserEmail(email=email)
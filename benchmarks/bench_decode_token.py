@@ -0,0 +1,58 @@
+'''Compare the old try-and-fail decode_token with the issuer dispatcher.
+
+Run from the project root with the usual .env in place:
+
+    python benchmarks/bench_decode_token.py
+'''
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from timeit import repeat
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+
+from jwt import decode, encode, InvalidTokenError
+from core.config import settings
+from utils.utils import decode_token
+
+NUMBER = 5000
+
+
+def legacy_decode_token(token: str) -> dict:
+    try:
+        return decode(
+            token,
+            settings.SIGNING_KEY,
+            algorithms=settings.AUTH0_ALGORITHMS,
+            audience=settings.AUTH0_API_AUDIENCE,
+            issuer=settings.AUTH0_ISSUER,
+        )
+    except InvalidTokenError:
+        return decode(token, settings.SIGNING_KEY, algorithms=settings.AUTH0_ALGORITHMS)
+
+
+def make_token(claims: dict) -> str:
+    claims = {"sub": "bench", "email": "bench@example.com", **claims}
+    claims["exp"] = datetime.utcnow() + timedelta(hours=1)
+    return encode(claims, settings.SIGNING_KEY, algorithm=settings.AUTH0_ALGORITHMS)
+
+
+def best_usec(func, token: str) -> float:
+    timings = repeat(lambda: func(token), number=NUMBER, repeat=5)
+    return min(timings) / NUMBER * 1e6
+
+
+def main():
+    tokens = {
+        "local": make_token({}),
+        "auth0": make_token({"iss": settings.AUTH0_ISSUER, "aud": settings.AUTH0_API_AUDIENCE}),
+    }
+    print(f"{'token':<8}{'before, us':>14}{'after, us':>14}{'speedup':>10}")
+    for kind, token in tokens.items():
+        before = best_usec(legacy_decode_token, token)
+        after = best_usec(decode_token, token)
+        print(f"{kind:<8}{before:>14.2f}{after:>14.2f}{before / after:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
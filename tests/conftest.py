@@ -1,12 +1,14 @@
+import sys
 import pytest
 from fastapi.testclient import TestClient
-from app.main import app
-from app.core.config import settings  
-from app.db.database import get_async_session
-from app.utils.auth import get_current_user
+from main import app
+from core.config import settings  
+from db import redis as redis_module
+from db.database import get_async_session
+from utils.auth import get_current_user
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from typing import AsyncGenerator
-from app.services.company_service import CompanyActions
+from services.company_service import CompanyActions
 
 
 @pytest.fixture(scope="module")
@@ -20,4 +22,78 @@ def test_user():
 
 @pytest.fixture(scope="module")
 def test_company():
-    return {"name": "mycom", "description": "myDesc"}
\ No newline at end of file
+    return {"name": "mycom", "description": "myDesc"}
+
+
+class FakePipeline:
+    '''Queues commands and runs them against the FakeRedis on execute'''
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        pass
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((getattr(self.redis, name), args, kwargs))
+
+    async def execute(self):
+        return [await command(*args, **kwargs) for command, args, kwargs in self.commands]
+
+
+class FakeRedis:
+    '''In-memory stand-in for the commands the caches and stores use'''
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = str(value)
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def incr(self, key):
+        self.data[key] = str(int(self.data.get(key, 0)) + 1)
+        return int(self.data[key])
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def zadd(self, name, mapping):
+        self.data.setdefault(name, {}).update(mapping)
+
+    async def zrem(self, name, *members):
+        for member in members:
+            self.data.get(name, {}).pop(member, None)
+
+    async def zrangebyscore(self, name, min, max, start=0, num=None, withscores=False):
+        low = float(str(min).lstrip("("))
+        exclusive = str(min).startswith("(")
+        rows = sorted(
+            (score, member) for member, score in self.data.get(name, {}).items()
+            if score > low or (score == low and not exclusive)
+        )
+        rows = rows[start:] if num is None else rows[start:start + num]
+        return [(member, score) for score, member in rows] if withscores else [member for _, member in rows]
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    '''Points every module that imported db.redis.get_redis at one FakeRedis'''
+    redis = FakeRedis()
+    get_redis = redis_module.get_redis
+    for module in list(sys.modules.values()):
+        if getattr(module, "get_redis", None) is get_redis:
+            monkeypatch.setattr(module, "get_redis", lambda: redis)
+    return redis
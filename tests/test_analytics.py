@@ -0,0 +1,17 @@
+from datetime import date
+from schemas.analytics_schema import ScoreSummary
+
+
+def test_summary_from_daily_buckets():
+    summary = ScoreSummary.from_buckets([
+        (date(2024, 5, 1), 2, 3, 4),
+        (date(2024, 5, 2), 1, 3, 6),
+    ])
+    assert summary.attempts == 3
+    assert summary.average == 0.6
+    assert [bucket.average for bucket in summary.history] == [0.75, 0.5]
+
+def test_summary_without_attempts():
+    summary = ScoreSummary.from_buckets([])
+    assert summary.average == 0.0
+    assert summary.history == []
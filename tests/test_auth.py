@@ -0,0 +1,33 @@
+import pytest
+from datetime import datetime, timedelta
+from jwt import encode, InvalidTokenError
+from core.config import settings
+from utils.utils import decode_token, get_token_type, BlockingPool
+
+
+def make_token(**claims):
+    claims.update({"sub": "test", "exp": datetime.utcnow() + timedelta(hours=1)})
+    return encode(claims, settings.SIGNING_KEY, algorithm=settings.AUTH0_ALGORITHMS)
+
+def test_decode_local_token():
+    payload = decode_token(make_token(email="test@test.com"))
+    assert get_token_type(payload) == "local"
+    assert payload["email"] == "test@test.com"
+
+def test_decode_auth0_token():
+    token = make_token(iss=settings.AUTH0_ISSUER, aud=settings.AUTH0_API_AUDIENCE)
+    assert get_token_type(decode_token(token)) == "auth0"
+
+def test_auth0_token_with_wrong_audience():
+    token = make_token(iss=settings.AUTH0_ISSUER, aud="https://other-api.com")
+    with pytest.raises(InvalidTokenError):
+        decode_token(token)
+
+
+@pytest.mark.asyncio
+async def test_blocking_pool_runs_after_shutdown():
+    pool = BlockingPool(1, "test")
+    assert await pool.run(sum, [1, 2]) == 3
+    pool.shutdown()
+    assert await pool.run(sum, [3, 4]) == 7
+    assert pool.stats()["completed"] == 2
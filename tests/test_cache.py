@@ -0,0 +1,41 @@
+import pytest
+from time import time
+from types import SimpleNamespace
+from utils.cache import TTLCache
+from utils.user_cache import UserIdentityCache
+
+
+def test_cache_hit_and_miss():
+    cache = TTLCache(maxsize=2)
+    assert cache.get("token") is None
+    cache.set("token", {"sub": "test"})
+    assert cache.get("token") == {"sub": "test"}
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+def test_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+
+def test_cache_expires_at_timestamp():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("expired", 1, expires_at=time() - 1)
+    cache.set("live", 2, expires_at=time() + 600)
+    assert cache.get("expired") is None
+    assert cache.get("live") == 2
+
+
+@pytest.mark.asyncio
+async def test_user_cache_never_stores_password(fake_redis):
+    user = SimpleNamespace(id=1, username="test", email="test@test.com", password="$2b$12$hash",
+                           age=None, description=None, disabled=False, is_active=True)
+
+    cached = await UserIdentityCache(ttl=60, local_size=10, local_ttl=10).set(user)
+
+    assert not hasattr(cached, "password")
+    assert "password" not in fake_redis.data[UserIdentityCache.key("test@test.com")]
@@ -1,5 +1,10 @@
 import pytest
 import json
+from types import SimpleNamespace
+from schemas.user_schema import UserId
+from services.company_service import CompanyActions
+from utils.permissions import PermissionResolver
+from utils.role_cache import role_cache, OWNER, ADMIN, MEMBER
 
 # test login user , get token
 @pytest.mark.asyncio
@@ -108,4 +113,88 @@ async def test_accept_request(client, test_user):
                                   "password": "$2b$12$FcSL9P.sU9i8Lf/Y2sP.XO/PLDX8XGsBCDDYKyLmso6VJsvOUAZS2",
                                   "age": None,
                                   "description": None
-                                }
\ No newline at end of file
+                                }
+
+
+class FakeResult:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+    def one_or_none(self):
+        return self.rows[0]
+
+    def scalar_one_or_none(self):
+        return self.rows[0]
+
+class FakeSession:
+    '''Returns the given results in order; while_executing runs before each one is returned'''
+    def __init__(self, *results, objects=None, while_executing=None):
+        self.results = list(results)
+        self.objects = objects or {}
+        self.while_executing = while_executing
+
+    async def execute(self, statement):
+        if self.while_executing is not None:
+            await self.while_executing()
+        return FakeResult(self.results.pop(0))
+
+    async def get(self, model, object_id, **kwargs):
+        return self.objects[model.__name__]
+
+    async def commit(self):
+        pass
+
+def dashboard_row(kind, company_id, company_name, item_id=None, is_administrator=False):
+    return SimpleNamespace(kind=kind, company_id=company_id, company_name=company_name, item_id=item_id, is_administrator=is_administrator)
+
+#test my companies dashboard
+@pytest.mark.asyncio
+async def test_my_companies(fake_redis):
+    session = FakeSession([
+        dashboard_row("owned", 1, "mycom"),
+        dashboard_row("membership", 2, "partner", is_administrator=True),
+        dashboard_row("invitation", 3, "invites", item_id=31),
+        dashboard_row("request", 4, "asked", item_id=41),
+    ])
+    dashboard = await CompanyActions(session, UserId(id=5)).my_companies()
+
+    assert [company.id for company in dashboard.owned] == [1]
+    assert dashboard.memberships[0].id == 2 and dashboard.memberships[0].is_administrator
+    assert [(item.id, item.company.id) for item in dashboard.invitations] == [(31, 3)]
+    assert [(item.id, item.company.id) for item in dashboard.requests] == [(41, 4)]
+
+    # served from the cache without another query
+    assert await CompanyActions(FakeSession(), UserId(id=5)).my_companies() == dashboard
+
+@pytest.mark.asyncio
+async def test_accept_invitation_drops_my_companies(fake_redis):
+    session = FakeSession([dashboard_row("invitation", 3, "invites", item_id=31)])
+    await CompanyActions(session, UserId(id=5)).my_companies()
+    assert "my_companies:5" in fake_redis.data
+
+    accepted = SimpleNamespace(allowed=True, company_id=3, company_name="invites", user_id=5, username="test")
+    await CompanyActions(FakeSession([accepted]), UserId(id=5)).accept_invitation(31)
+    assert "my_companies:5" not in fake_redis.data
+
+#test a role read while the owner revokes it
+@pytest.mark.asyncio
+async def test_role_read_during_remove_admin_is_not_cached(fake_redis):
+    membership = SimpleNamespace(is_administrator=True)
+
+    async def remove_admin():
+        owner_session = FakeSession([membership], objects={"Company": SimpleNamespace(owner_id=1)})
+        await CompanyActions(owner_session, UserId(id=1)).remove_admin(5, 3)
+
+    # the membership query sees the admin flag, then remove_admin commits before the role is cached
+    session = FakeSession([(3, None, False, True, True)], while_executing=remove_admin)
+    permission = await PermissionResolver(session, UserId(id=5)).company(3, roles=(OWNER, ADMIN, MEMBER))
+    assert permission.role == ADMIN
+    assert not membership.is_administrator
+
+    role, version = await role_cache.get(3, 5)
+    assert role is None
+    session = FakeSession([(3, None, False, False, True)])
+    assert (await PermissionResolver(session, UserId(id=5)).company(3, roles=(OWNER, ADMIN, MEMBER))).role == MEMBER
@@ -0,0 +1,41 @@
+import json
+import pytest
+from datetime import datetime, timezone
+from schemas.quiz_schema import QuizResponseRecord
+from utils.response_store import ResponseStore
+
+
+def make_record(result_id, quiz_id):
+    return QuizResponseRecord(
+        result_id=result_id, user_id=7, company_id=1, quiz_id=quiz_id,
+        correct_answers=1, total_questions=2, created_at=datetime(2024, 5, 1, tzinfo=timezone.utc),
+        answers=[{"question_id": 1, "answer_id": 11, "is_correct": True}, {"question_id": 2, "answer_id": 21, "is_correct": False}],
+    )
+
+@pytest.fixture
+def store(fake_redis):
+    for record in [make_record(1, 3), make_record(2, 3), make_record(3, 4)]:
+        fake_redis.data[ResponseStore.key(record)] = record.model_dump_json()
+        fake_redis.data.setdefault(ResponseStore.index(1), {})[ResponseStore.key(record)] = record.result_id
+    return ResponseStore(ttl=60, batch_size=2)
+
+@pytest.mark.asyncio
+async def test_export_csv_filters_by_quiz(store):
+    chunks = [chunk async for chunk in store.export_csv(1, store.pattern(1, quiz_id=3))]
+    lines = "".join(chunks).splitlines()
+    assert lines[0].startswith("result_id,user_id")
+    assert len(lines) == 1 + 4
+
+@pytest.mark.asyncio
+async def test_export_jsonl_reads_in_batches(store):
+    chunks = [chunk async for chunk in store.export_jsonl(1, store.pattern(1))]
+    assert len(chunks) == 2
+    assert sum(chunk.count("\n") for chunk in chunks) == 3
+
+@pytest.mark.asyncio
+async def test_export_reads_in_result_order_and_prunes_expired(store, fake_redis):
+    del fake_redis.data[ResponseStore.key(make_record(2, 3))]
+    chunks = [chunk async for chunk in store.export_jsonl(1, store.pattern(1))]
+    result_ids = [json.loads(line)["result_id"] for line in "".join(chunks).splitlines()]
+    assert result_ids == [1, 3]
+    assert ResponseStore.key(make_record(2, 3)) not in fake_redis.data[ResponseStore.index(1)]
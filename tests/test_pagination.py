@@ -0,0 +1,38 @@
+import pytest
+from fastapi import HTTPException
+from starlette.responses import Response
+from core.config import settings
+from db.models import Company
+from utils.utils import PageParams, Paginate, encode_cursor, decode_cursor
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor(["mycom", 42])
+    assert decode_cursor(cursor) == ["mycom", 42]
+
+def test_invalid_cursor():
+    with pytest.raises(HTTPException) as error:
+        decode_cursor("not-a-cursor")
+    assert error.value.status_code == 400
+
+def test_next_cursor_header():
+    response = Response()
+    params = PageParams(response, cursor=encode_cursor([3]))
+    assert params.cursor == [3]
+    params.set_next_cursor(encode_cursor([6]))
+    assert decode_cursor(response.headers["X-Next-Cursor"]) == [6]
+
+def test_limit_is_capped():
+    params = PageParams(Response(), limit=10_000)
+    assert params.limit == settings.page_size_max
+    assert PageParams(Response(), limit=None).limit == settings.page_size_default
+
+def test_cursor_filters_by_last_id():
+    paginator = Paginate(None, Company, PageParams(Response()))
+    assert str(paginator.after_cursor([6])) == "companies.id > :id_1"
+
+@pytest.mark.parametrize("values", [["2024-05-01T00:00:00"], [6, 7], [True]])
+def test_cursor_rejects_foreign_keys(values):
+    paginator = Paginate(None, Company, PageParams(Response()))
+    with pytest.raises(HTTPException):
+        paginator.after_cursor(values)
@@ -0,0 +1,165 @@
+import json
+import warnings
+import pytest
+from types import SimpleNamespace
+from pydantic import ValidationError
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.sql import compiler
+from schemas.quiz_schema import QuizImport, QuizAttempt, AnswerKey, AnswersBase, QuizFull, QuizMember
+from schemas.user_schema import UserId
+from services.quiz_service import QuizService
+from utils.permissions import PermissionResolver, path_cache
+from utils.quiz_cache import AnswerKeyCache, invalidate_quiz
+from utils.role_cache import role_cache, OWNER, ADMIN, MEMBER
+from utils.exceptions import QuizNotFound, ValuesError, NotPermission
+
+
+def make_question(*correct):
+    return {
+        "question_text": "2 + 2?",
+        "answers": [{"answer_text": str(i), "is_correct": flag} for i, flag in enumerate(correct)],
+    }
+
+def test_import_accepts_valid_quiz():
+    quiz = QuizImport.model_validate({"title": "Math", "questions": [make_question(False, True)]})
+    assert len(quiz.questions[0].answers) == 2
+
+@pytest.mark.parametrize("correct", [(True,), (True, True), (False, False)])
+def test_import_rejects_invalid_answer_set(correct):
+    with pytest.raises(ValidationError):
+        QuizImport.model_validate({"title": "Math", "questions": [make_question(*correct)]})
+
+def test_import_requires_questions():
+    with pytest.raises(ValidationError):
+        QuizImport.model_validate({"title": "Math", "questions": []})
+
+KEY_ROWS = [(1, 10, False), (1, 11, True), (2, 20, True), (2, 21, False)]
+
+def test_answer_key_grades_answers():
+    key = AnswerKey.from_rows(KEY_ROWS)
+    assert key.option_counts == [2, 2]
+    assert key.grade({1: 11, 2: 21}) == [(1, 11, True), (2, 21, False)]
+
+@pytest.mark.parametrize("answers", [{1: 20}, {3: 30}])
+def test_answer_key_rejects_foreign_answers(answers):
+    with pytest.raises(ValueError):
+        AnswerKey.from_rows(KEY_ROWS).grade(answers)
+
+def test_attempt_rejects_duplicate_questions():
+    with pytest.raises(ValidationError):
+        QuizAttempt.model_validate({"answers": [{"question_id": 1, "answer_id": 10}, {"question_id": 1, "answer_id": 11}]})
+
+@pytest.mark.parametrize("correct, error", [((True,), ValuesError), ((True, True), ValueError), ((False, False), ValueError)])
+def test_answer_set_validated_before_io(correct, error):
+    answers = [AnswersBase(answer_text=str(i), is_correct=flag) for i, flag in enumerate(correct)]
+    with pytest.raises(error):
+        QuizService.validate_answers(answers)
+
+
+class RollbackSession:
+    rolled_back = False
+
+    async def rollback(self):
+        self.rolled_back = True
+
+class ForeignKeyViolation(Exception):
+    pgcode = "23503"
+
+@pytest.mark.asyncio
+async def test_stale_path_write_reports_not_found():
+    session = RollbackSession()
+    permissions = PermissionResolver(session, None)
+    path_cache.set(("quiz", 5), (1, 5))
+
+    with pytest.raises(QuizNotFound):
+        async with permissions.parent_guard("quiz", 5, QuizNotFound):
+            raise IntegrityError("INSERT", {}, ForeignKeyViolation())
+
+    assert session.rolled_back
+    assert path_cache.get(("quiz", 5)) is None
+
+
+@pytest.mark.asyncio
+async def test_answer_key_change_reaches_every_worker(fake_redis):
+    keys = [AnswerKey.from_rows([(1, 11, True), (1, 12, False)]), AnswerKey.from_rows([(1, 11, False), (1, 12, True)])]
+
+    async def build(quiz_id):
+        return keys[0]
+
+    workers = [AnswerKeyCache(ttl=60, local_size=10, local_ttl=60) for _ in range(2)]
+    for worker in workers:
+        assert (await worker.get_or_build(3, build)).correct_ids == [11]
+
+    keys.pop(0)
+    await invalidate_quiz(3)
+    for worker in workers:
+        assert (await worker.get_or_build(3, build)).correct_ids == [12]
+
+
+class QuizSession:
+    def __init__(self, quiz):
+        self.quiz = quiz
+
+    async def execute(self, statement):
+        return SimpleNamespace(scalar_one_or_none=lambda: self.quiz)
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("role, model", [(OWNER, QuizFull), (MEMBER, QuizMember)])
+async def test_full_quiz_matches_declared_response(fake_redis, role, model):
+    answers = [SimpleNamespace(id=12, answer_text="4", is_correct=True), SimpleNamespace(id=11, answer_text="5", is_correct=False)]
+    question = SimpleNamespace(id=21, question_text="2 + 2?", options=answers)
+    quiz = SimpleNamespace(id=4, company_id=1, title="Math", description=None, frequency_days=None, questions=[question])
+    path_cache.set(("quiz", 4), (1, 4))
+    await role_cache.set(role, 1, 9, version="0")
+
+    document = await QuizService(QuizSession(quiz), UserId(id=9)).full_quiz(4)
+
+    model.model_validate_json(document)
+    answer = json.loads(document)["questions"][0]["answers"][0]
+    assert answer["id"] == 11
+    assert ("is_correct" in answer) == (model is QuizFull)
+
+
+class CloneSession:
+    '''Compiles the clone statement with cartesian product linting and returns id pairs'''
+    committed = False
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    async def execute(self, statement):
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            statement.compile(dialect=postgresql.dialect(), linting=compiler.COLLECT_CARTESIAN_PRODUCTS | compiler.WARN_LINTING)
+        self.statements.append(statement)
+        return SimpleNamespace(all=lambda: self.rows)
+
+    async def commit(self):
+        self.committed = True
+
+@pytest.mark.asyncio
+async def test_clone_quiz_maps_old_to_new_ids(fake_redis):
+    path_cache.set(("quiz", 4), (1, 4))
+    await role_cache.set(OWNER, 1, 9, version="0")
+    await role_cache.set(ADMIN, 2, 9, version="0")
+    session = CloneSession([("quiz", 4, 40), ("question", 21, 210), ("question", 22, 220), ("answer", 11, 110)])
+
+    clone = await QuizService(session, UserId(id=9)).clone_quiz(4, company_id=2)
+
+    assert session.committed
+    assert (clone.quiz_id, clone.company_id) == (40, 2)
+    assert clone.questions == {21: 210, 22: 220}
+    assert clone.answers == {11: 110}
+
+@pytest.mark.asyncio
+async def test_clone_quiz_requires_admin_of_target_company(fake_redis):
+    path_cache.set(("quiz", 4), (1, 4))
+    await role_cache.set(OWNER, 1, 9, version="0")
+    await role_cache.set(MEMBER, 2, 9, version="0")
+    session = CloneSession([])
+
+    with pytest.raises(NotPermission):
+        await QuizService(session, UserId(id=9)).clone_quiz(4, company_id=2)
+    assert session.statements == []